@@ -0,0 +1,106 @@
+"""Step cost of Atari preprocessing: the wrapper chain against `FusedAtariPreprocessing`.
+
+Usage:
+    python benchmarks/bench_atari.py [--game BreakoutNoFrameskip-v4] [--steps 5000] [--repeats 3] [--num-envs 8]
+        [--json]
+
+`emulator` only runs the ALE for 4 frames per step and is the floor for the other rows. `wrappers` and `fused` step
+`AtariEnv` with `--env.preprocessing wrappers` and `fused`, observation included, with random actions and a fixed
+seed. `ale-vector` steps `--num-envs` games with `--env.backend ale-vector` and reports the time per env step, so
+it compares with the other rows for the same number of games; skip it with `--num-envs 0`. The best of
+`--repeats` runs is reported.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from vlarl_infra.envs.atari.config import AtariConfig
+from vlarl_infra.utils.registration import load_env
+
+AtariEnv = load_env("Atari-v1")
+
+
+def time_emulator(game: str, steps: int) -> float:
+    env = AtariEnv(AtariConfig(name=game, preprocessing="fused"))
+    ale = env.env.unwrapped.ale
+    action_set = env.env.unwrapped._action_set
+    rng = np.random.default_rng(0)
+    actions = rng.integers(len(action_set), size=steps)
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for action in actions:
+        for _ in range(4):
+            ale.act(action_set[action])
+        if ale.game_over():
+            ale.reset_game()
+    seconds = time.perf_counter() - start
+    env.close()
+    return seconds
+
+
+def time_env(game: str, preprocessing: str, steps: int) -> float:
+    env = AtariEnv(AtariConfig(name=game, preprocessing=preprocessing))
+    rng = np.random.default_rng(0)
+    actions = rng.integers(env.env.action_space.n, size=(steps, 1))
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    seconds = time.perf_counter() - start
+    env.close()
+    return seconds
+
+
+def time_vector(game: str, num_envs: int, steps: int) -> float:
+    """Seconds for `steps` env steps, spread over `num_envs` games."""
+    env = AtariEnv.make_vector_env(AtariConfig(name=game, backend="ale-vector", num_envs=num_envs))
+    rng = np.random.default_rng(0)
+    actions = rng.integers(4, size=(steps // num_envs, num_envs, 1))
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for action in actions:
+        env.step(action)
+    seconds = time.perf_counter() - start
+    env.close()
+    return seconds * steps / (len(actions) * num_envs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--game", default="BreakoutNoFrameskip-v4")
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--num-envs", type=int, default=8, help="Games stepped together by the ale-vector row")
+    parser.add_argument("--json", action="store_true", help="Print results as a JSON object")
+    args = parser.parse_args()
+
+    timings = {
+        "emulator": min(time_emulator(args.game, args.steps) for _ in range(args.repeats)),
+        "wrappers": min(time_env(args.game, "wrappers", args.steps) for _ in range(args.repeats)),
+        "fused": min(time_env(args.game, "fused", args.steps) for _ in range(args.repeats)),
+    }
+    if args.num_envs > 0:
+        timings["ale-vector"] = min(time_vector(args.game, args.num_envs, args.steps) for _ in range(args.repeats))
+    results = {
+        name: {"us_per_step": seconds / args.steps * 1e6, "steps_per_s": args.steps / seconds}
+        for name, seconds in timings.items()
+    }
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    emulator = results["emulator"]["us_per_step"]
+    for name, result in results.items():
+        overhead = result["us_per_step"] - emulator
+        print(
+            f"{name:>10}: {result['us_per_step']:7.1f} us/step {result['steps_per_s']:8.0f} steps/s"
+            + ("" if name == "emulator" else f" ({overhead:6.1f} us/step over the emulator)")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Startup cost of the CLI and of each env family.
+
+Usage:
+    python benchmarks/bench_import.py [--repeats 3]
+
+Every measurement runs in a fresh interpreter so that module caches don't hide the cost.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from vlarl_infra.utils.registration import LAZY_ENVS, is_env_available
+
+_SNIPPET = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def time_statement(statement: str, repeats: int) -> float | None:
+    timings = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-c", _SNIPPET.format(statement=statement)], capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return None
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print results as a JSON object")
+    args = parser.parse_args()
+
+    results = {
+        "vlarl_infra": time_statement("import vlarl_infra", args.repeats),
+        "vlarl_infra.cli": time_statement("import vlarl_infra.cli", args.repeats),
+    }
+    for uid, entry in LAZY_ENVS.items():
+        if not is_env_available(uid):
+            results[uid] = None
+            continue
+        results[uid] = time_statement(
+            f"from vlarl_infra.utils.registration import load_env; load_env({uid!r})", args.repeats
+        )
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    for name, seconds in results.items():
+        print(f"{name:>16}: " + ("not installed" if seconds is None else f"{seconds * 1e3:8.1f} ms"))
+
+
+if __name__ == "__main__":
+    main()
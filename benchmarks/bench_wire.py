@@ -0,0 +1,77 @@
+"""Bytes copied per step when serializing an observation, before and after the zero-copy wire path.
+
+Usage:
+    python benchmarks/bench_wire.py [--steps 50]
+
+Memory traffic is measured with `tracemalloc` (numpy reports its buffer allocations to it), so "bytes allocated"
+is the amount of observation data duplicated while building one message.
+"""
+import argparse
+import dataclasses
+import time
+import tracemalloc
+
+import numpy as np
+from vlarl_client import msgpack_numpy
+
+from vlarl_infra.envs.base_env import Observation
+from vlarl_infra.transport import wire
+
+
+def robomimic_like_obs() -> Observation:
+    return Observation(
+        images={
+            "agentview": np.random.randint(0, 255, (1, 720, 1280, 3), dtype=np.uint8),
+            "robot0_eye_in_hand": np.random.randint(0, 255, (1, 96, 96, 3), dtype=np.uint8),
+        },
+        states={
+            "robot0_eef_pos": np.random.rand(1, 3),
+            "robot0_eef_quat": np.random.rand(1, 4),
+            "robot0_gripper_qpos": np.random.rand(1, 2),
+            "object": np.random.rand(1, 14),
+        },
+        text="PickPlaceCan",
+    )
+
+
+def encode_asdict(obs: Observation):
+    return msgpack_numpy.Packer().pack(dict(message_type="infer", data=dataclasses.asdict(obs)))
+
+
+def encode_to_wire(obs: Observation):
+    return wire.pack_fragments(dict(message_type="infer", data=obs.to_wire()))
+
+
+def measure(name: str, encode, obs: Observation, steps: int):
+    tracemalloc.start()
+    allocated = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        message = encode(obs)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+        del message
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    print(f"{name:>10}: {allocated / steps / 2**20:8.2f} MiB allocated/step, {elapsed / steps * 1e3:7.3f} ms/step")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=50)
+    args = parser.parse_args()
+
+    obs = robomimic_like_obs()
+    payload = sum(v.nbytes for v in obs.images.values()) + sum(v.nbytes for v in obs.states.values())
+    print(f"Observation payload: {payload / 2**20:.2f} MiB")
+    measure("asdict", encode_asdict, obs, args.steps)
+    measure("to_wire", encode_to_wire, obs, args.steps)
+
+    decoded = msgpack_numpy.unpackb(b"".join(encode_to_wire(obs)))["data"]
+    assert all(np.array_equal(decoded["images"][k], v) for k, v in obs.images.items())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""End-to-end throughput of the worker data path: DummyEnv -> transport -> MockAgentServer over loopback.
+
+Usage:
+    python benchmarks/bench_worker.py [--image-sizes 84 224 512] [--action-horizons 8 16] [--replan-steps 0 4]
+        [--num-workers 1 4] [--transports websocket zero-copy] [--output results.json] [--compare baseline.json]
+
+Every combination of the swept parameters is run with `--num-workers` worker processes against one in-process
+mock server, with `dummy-v1` in `pool` mode so the env is not the bottleneck. For each run the suite reports
+steps/s over all workers, bytes received by the server per env step, and p50/p95/p99 of the profiled phases.
+`--replan-steps 0` means executing the whole action chunk. Results are written as JSON so runs on different commits
+can be compared with `--compare`. No simulator or GPU is needed.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from loguru import logger
+
+from vlarl_infra.cli import Args, _make_worker_agent, _run_single
+from vlarl_infra.envs.dummy_env import DummyEnvConfig
+from vlarl_infra.transport.codecs import ObservationEncoder
+from vlarl_infra.utils.profiling import LatencyHistogram, StepProfiler
+
+# Run as `python benchmarks/bench_worker.py`, `sys.path[0]` is `benchmarks/`; the mock server lives in the repo's
+# `tests` package. The worker processes re-run this file, so they get the same path.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tests.test_mock_server import MockAgentServer  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(action_horizon: int) -> tuple[MockAgentServer, int]:
+    port = _free_port()
+    server = MockAgentServer(host="127.0.0.1", port=port, action_horizon=action_horizon)
+    threading.Thread(target=server.serve_forever, daemon=True, name="mock-server").start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server, port
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Mock server did not start")
+
+
+def _worker(config: dict, output: str):
+    """Runs one worker and pickles its step count, step-loop time and phase histograms to `output`."""
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    args = Args(
+        uid="Dummy-v1",
+        env=DummyEnvConfig(
+            img_width=config["image_size"], img_height=config["image_size"], obs_mode="pool", terminated_prob=0.0
+        ),
+        num_episodes=config["num_episodes"],
+        server_host="127.0.0.1",
+        server_port=config["port"],
+        transport=config["transport"],
+        replan_steps=config["replan_steps"] or None,
+        max_episode_steps=config["episode_steps"],
+    )
+    profiler = StepProfiler()
+    worker_agent = _make_worker_agent(args)
+    start = time.perf_counter()
+    _run_single(args, worker_agent, ObservationEncoder(args.codec), profiler)
+    with open(output, "wb") as f:
+        pickle.dump((profiler.total_steps, time.perf_counter() - start, profiler.total), f)
+
+
+def run_config(image_size: int, action_horizon: int, replan_steps: int, num_workers: int, transport: str,
+               num_episodes: int, episode_steps: int) -> dict:
+    server, port = _start_server(action_horizon)
+    config = dict(
+        image_size=image_size, replan_steps=replan_steps, transport=transport, port=port,
+        num_episodes=num_episodes, episode_steps=episode_steps,
+    )
+    # Workers are separate interpreters, as in a real deployment; multiprocessing children would share this
+    # process's resource tracker with the server and break the shared-memory transport's bookkeeping.
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"worker_{i}.pkl") for i in range(num_workers)]
+        workers = [
+            subprocess.Popen([sys.executable, __file__, "--worker", json.dumps(config), "--worker-output", path])
+            for path in paths
+        ]
+        if any(worker.wait() != 0 for worker in workers):
+            raise RuntimeError(f"A worker failed for {config}")
+        outputs = []
+        for path in paths:
+            with open(path, "rb") as f:
+                outputs.append(pickle.load(f))
+
+    steps = sum(num_steps for num_steps, _, _ in outputs)
+    # Process start-up is excluded: throughput is measured over the slowest worker's step loop.
+    elapsed = max(seconds for _, seconds, _ in outputs)
+    phases: dict[str, LatencyHistogram] = {}
+    for _, _, histograms in outputs:
+        for name, histogram in histograms.items():
+            phases.setdefault(name, LatencyHistogram()).merge(histogram)
+    return {
+        "image_size": image_size,
+        "action_horizon": action_horizon,
+        "replan_steps": replan_steps or action_horizon,
+        "num_workers": num_workers,
+        "transport": transport,
+        "steps": steps,
+        "steps_per_second": steps / elapsed,
+        "bytes_per_step": server.bytes_received / max(steps, 1),
+        "phases": {name: h.summary() for name, h in phases.items()},
+    }
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": multiprocessing.cpu_count(),
+    }
+
+
+def _key(result: dict) -> tuple:
+    return tuple(result[k] for k in ("image_size", "action_horizon", "replan_steps", "num_workers", "transport"))
+
+
+def compare(results: list[dict], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {_key(r): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        base = baseline.get(_key(result))
+        if base is None:
+            continue
+        ratio = result["steps_per_second"] / base["steps_per_second"]
+        print(f"  {_key(result)}: {base['steps_per_second']:.1f} -> {result['steps_per_second']:.1f} steps/s ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image-sizes", type=int, nargs="+", default=[84, 224])
+    parser.add_argument("--action-horizons", type=int, nargs="+", default=[8])
+    parser.add_argument("--replan-steps", type=int, nargs="+", default=[0])
+    parser.add_argument("--num-workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--transports", nargs="+", default=["websocket"], choices=["websocket", "zero-copy", "shm"])
+    parser.add_argument("--episodes", type=int, default=2)
+    parser.add_argument("--episode-steps", type=int, default=200)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare steps/s against")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        _worker(json.loads(args.worker), args.worker_output)
+        return
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    results = []
+    for image_size, horizon, replan, workers, transport in itertools.product(
+        args.image_sizes, args.action_horizons, args.replan_steps, args.num_workers, args.transports
+    ):
+        if replan > horizon:
+            continue
+        result = run_config(image_size, horizon, replan, workers, transport, args.episodes, args.episode_steps)
+        results.append(result)
+        infer = result["phases"].get("infer", {})
+        print(
+            f"size={image_size:4d} horizon={horizon:3d} replan={result['replan_steps']:3d} workers={workers:2d} "
+            f"{transport:>9}: {result['steps_per_second']:8.1f} steps/s, {result['bytes_per_step'] / 1024:8.1f} KiB/step, "
+            f"infer p50/p99 {infer.get('p50', 0) * 1e3:.2f}/{infer.get('p99', 0) * 1e3:.2f} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": _environment(), "results": results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
+import asyncio
 import dataclasses
+import os
 import sys
 import collections
+import concurrent.futures
+import functools
+import time
 from typing import Literal
+import numpy as np
 import gymnasium as gym
 import tyro
+import websockets
 from loguru import logger
 
 import vlarl_infra
-from vlarl_infra.utils.registration import REGISTERED_ENV_CONFIGS
-from vlarl_infra.envs.base_env import BaseEnvConfig
+from vlarl_infra.utils.registration import REGISTERED_ENV_CONFIGS, is_env_available, load_env
+from vlarl_infra.envs.base_env import BaseEnvConfig, copy_observation, request_render, reuses_obs_buffers, step_chunk
+from vlarl_infra.envs.vector_env import SubprocVectorEnv
 from vlarl_client.websocket_worker_agent import WebSocketWorkerAgent
+from vlarl_infra.transport import ZeroCopyWorkerAgent, SharedMemoryWorkerAgent, AsyncWorkerAgent, FeedbackChannel
+from vlarl_infra.transport.codecs import CodecConfig, ObservationEncoder
+from vlarl_infra.utils.affinity import limit_threads, parse_cpu_list, set_affinity, thread_report
+from vlarl_infra.utils.profiling import StepProfiler, ProfileSink, ProfileWrapper, make_sink
 import vlarl_infra.utils.wrappers as _wrappers
 
 
@@ -22,78 +34,612 @@ class Args:
 
     server_host: str =  "0.0.0.0"
     server_port: int = 8000
+    # Connection attempts to retry over the whole run, whether connecting fails or an open connection is lost. The
+    # env is kept warm in between and the interrupted episode is dropped. The delay starts at `reconnect_backoff`
+    # seconds and doubles. With --num-envs > 1 only connecting is retried.
+    reconnect_attempts: int = 0
+    reconnect_backoff: float = 1.0
+    # `zero-copy` streams image buffers straight to the socket instead of copying them into each message.
+    # `shm` passes them through shared memory and only sends descriptors; the server must run on the same node.
+    transport: Literal["websocket", "zero-copy", "shm"] = "websocket"
+    shm_slots: int = 4
+    # Per-key compression applied to observations before infer and feedback.
+    codec: CodecConfig = dataclasses.field(default_factory=CodecConfig)
     
     use_remote_viewer: bool = False
     
     viewer_host: str = "0.0.0.0"
     viewer_port: int = 8001
+    # `msgpack` sends binary frames with raw JPEG bytes instead of base64 JPEGs in JSON.
+    viewer_protocol: Literal["json", "msgpack"] = "json"
+    viewer_max_fps: float | None = None
+    # Downscale viewer images so that their longest side is at most this many pixels.
+    viewer_max_side: int | None = None
     
     use_real_time: bool = False
     fps: float = 30.0
+
+    # Record every episode into this directory (one subdirectory per env with --num-envs > 1).
+    record_dir: str | None = None
+    # Target size of each recorded shard, per column.
+    record_chunk_mb: int = 64
+
+    # Time the phases of the step loop (env step, encode, infer, feedback, wrapper overheads) and log
+    # p50/p95/p99 and steps/s at the end of every episode.
+    profile: bool = False
+    # Also write the profile to this file: one JSON object per episode, or a Prometheus text file with run totals.
+    profile_sink: str | None = None
+    profile_sink_format: Literal["jsonl", "prometheus"] = "jsonl"
     
     replan_steps: int | None = None
     max_episode_steps: int | None = None
+    
+    # Number of env instances stepped in lockstep by this worker, each in its own subprocess.
+    # Observations are batched along the leading `b` dimension and sent as one infer request per step.
+    num_envs: int = 1
+
+    # Pin this worker and its env subprocesses to these cores, in `taskset -c` syntax, e.g. `0-3,8`.
+    cpus: str | None = None
+    # Cap the OpenMP/MKL/OpenBLAS/OpenCV/torch thread pools of the worker and its envs, e.g. 1 per pinned core.
+    num_threads: int | None = None
+
+    # Pipelined execution: request the next action chunk `pipeline_lookahead` steps before the replan boundary and
+    # keep executing the current chunk while the request is in flight, hiding the server round-trip.
+    pipelined: bool = False
+    pipeline_lookahead: int = 1
+    # How a late chunk is merged into the actions still queued from the previous one.
+    chunk_merge: Literal["replace", "blend"] = "replace"
 
-_CONFIGS_DICT = {k.lower(): Args(uid=k, env=v) for k, v in REGISTERED_ENV_CONFIGS.items()}
+    # `asyncio` runs the server connection and the remote viewer on one event loop and steps the env in an executor
+    # thread. Feedback is sent in the background instead of blocking the step loop.
+    runtime: Literal["sync", "asyncio"] = "sync"
+
+    # `batched` collects feedback and sends `feedback_batch_size` records per message, and at the end of every
+    # episode. Needs --transport zero-copy/shm or the asyncio runtime, and a server that handles `feedback_batch`.
+    feedback_mode: Literal["per-chunk", "batched"] = "per-chunk"
+    feedback_batch_size: int = 8
+    # Observations in batched feedback: `ref` points at the following infer message instead of repeating its
+    # observation, `none` leaves them out.
+    feedback_obs: Literal["full", "ref", "none"] = "ref"
+
+# Exit code of `_main` for invalid options and envs that cannot be built; `vlarl-run-fleet` does not restart those.
+EXIT_INVALID_CONFIG = 2
+
+_CONFIGS_DICT = {k.lower(): Args(uid=k, env=v) for k, v in REGISTERED_ENV_CONFIGS.items() if is_env_available(k)}
 
 def cli() -> Args:
     return tyro.extras.overridable_config_cli({k: (k, v) for k, v in _CONFIGS_DICT.items()})
 
-def _main(args: Args):
+def _make_env(args: Args, rank: int = 0, profiler: StepProfiler | None = None, viewer_thread: bool = True) -> gym.Env:
+    if args.num_threads is not None:
+        # Again here for --num-envs > 1: env subprocesses inherit the environment variables but not OpenCV's setting.
+        limit_threads(args.num_threads)
+    load_env(args.uid)
+    env = gym.make(args.uid, config=args.env, max_episode_steps=args.max_episode_steps)
+    if profiler is not None:
+        env = ProfileWrapper(env, profiler, "sim")
+    if args.record_dir is not None:
+        record_dir = args.record_dir if args.num_envs == 1 else os.path.join(args.record_dir, f"rank_{rank}")
+        env = _wrappers.RecordRolloutWrapper(env, record_dir, chunk_bytes=args.record_chunk_mb << 20)
+        if profiler is not None:
+            env = ProfileWrapper(env, profiler, "record")
+    if args.use_remote_viewer and rank == 0:
+        env = _wrappers.RemoteViewerWrapper(
+            env,
+            websocket_uri=f"ws://{args.viewer_host}:{args.viewer_port}/ws/env",
+            protocol=args.viewer_protocol,
+            max_fps=args.viewer_max_fps,
+            max_side=args.viewer_max_side,
+            start_communicator=viewer_thread,
+        )
+        logger.info(f"Remote viewer enabled at {args.viewer_host}:{args.viewer_port}")
+        if profiler is not None:
+            env = ProfileWrapper(env, profiler, "viewer")
+
+    if args.use_real_time:
+        env = _wrappers.RealTimeWrapper(env, fps=args.fps)
+        logger.info(f"Real-time mode enabled at {args.fps} FPS")
+        if profiler is not None:
+            env = ProfileWrapper(env, profiler, "real_time")
+    return env
+
+WorkerAgent = WebSocketWorkerAgent | ZeroCopyWorkerAgent
+
+def _make_worker_agent(args: Args) -> WorkerAgent:
+    if args.transport == "shm":
+        return SharedMemoryWorkerAgent(host=args.server_host, port=args.server_port, num_slots=args.shm_slots)
+    if args.transport == "zero-copy":
+        return ZeroCopyWorkerAgent(host=args.server_host, port=args.server_port)
+    return WebSocketWorkerAgent(host=args.server_host, port=args.server_port)
+
+def _close_worker_agent(worker_agent: WorkerAgent):
+    # `vlarl_client`'s agent has no `close`; its socket goes with it.
+    close = getattr(worker_agent, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception as e:
+        logger.debug(f"Failed to close the worker agent: {e}")
+
+def _make_feedback_channel(args: Args, worker_agent, encoder: ObservationEncoder, copy_obs: bool = False) -> FeedbackChannel:
+    return FeedbackChannel(
+        worker_agent,
+        encoder,
+        mode=args.feedback_mode,
+        batch_size=args.feedback_batch_size,
+        obs_mode=args.feedback_obs,
+        copy_obs=copy_obs,
+    )
+
+def _main(args: Args, sinks: list[ProfileSink] | None = None) -> int:
+    """Runs the worker and returns its exit code. `sinks` receive every episode summary, profiled or not."""
     logger.configure(handlers=[{"sink": sys.stdout, "level": args.log_level.upper()}])
 
     logger.info(f"vlarl_infra version: {vlarl_infra.__version__}")
     logger.info(f"Selected env: {args.uid}")
     logger.info(f"Env config: {args.env}")
 
-    try: 
-        worker_agent = WebSocketWorkerAgent(host=args.server_host, port=args.server_port)
-        logger.info(f"Connected to server with metadata: {worker_agent.get_server_metadata()}")
+    if args.cpus is not None:
+        set_affinity(parse_cpu_list(args.cpus))
+    if args.num_threads is not None:
+        limit_threads(args.num_threads)
+    logger.info(f"CPU and thread settings: {thread_report()}")
+
+    try:
+        encoder = ObservationEncoder(args.codec)
+    except ValueError as e:
+        logger.error(f"Invalid codec config: {e}")
+        return EXIT_INVALID_CONFIG
+    stack_size = len(args.codec.frame_stream_keys)
+    if stack_size and (args.replan_steps is None or args.replan_steps >= stack_size):
+        logger.warning(
+            f"--codec.frame-stream-keys only sends deltas when fewer than {stack_size} steps pass between infers "
+            f"(--replan-steps < {stack_size}); as configured, every infer is a keyframe"
+        )
+    sinks = list(sinks or [])
+    if args.profile and args.profile_sink:
+        sinks.append(make_sink(args.profile_sink, args.profile_sink_format))
+    profiler = StepProfiler(enabled=args.profile, sinks=sinks)
+
+    if args.feedback_mode == "batched" and args.transport == "websocket" and args.runtime != "asyncio":
+        logger.error("Batched feedback needs --transport zero-copy or shm, or --runtime asyncio")
+        return EXIT_INVALID_CONFIG
+
+    if args.num_envs > 1 and args.pipelined:
+        logger.error("Pipelined execution is not supported together with --num-envs > 1")
+        return EXIT_INVALID_CONFIG
+
+    # Envs with a native vector backend (e.g. --env.backend ale-vector) step their whole batch in this process.
+    try:
+        vector_env = load_env(args.uid).make_vector_env(args.env, max_episode_steps=args.max_episode_steps)
     except Exception as e:
-        logger.error(f"Failed to connect to server: {e}")
-        return
+        logger.error(f"Failed to build the env: {e}")
+        return EXIT_INVALID_CONFIG
+    if vector_env is not None:
+        if args.num_envs > 1 or args.pipelined or args.runtime == "asyncio":
+            logger.error("A native vector env does not support --num-envs > 1, --pipelined or the asyncio runtime")
+            vector_env.close()
+            return EXIT_INVALID_CONFIG
+        ignored = [
+            flag
+            for flag, used in [
+                ("--record-dir", args.record_dir is not None),
+                ("--use-remote-viewer", args.use_remote_viewer),
+                ("--use-real-time", args.use_real_time),
+            ]
+            if used
+        ]
+        if ignored:
+            logger.warning(f"Not applied to a native vector env: {', '.join(ignored)}")
+    vectorized = vector_env is not None or args.num_envs > 1
 
-    env = gym.make(args.uid, config=args.env, max_episode_steps=args.max_episode_steps)
-    if args.use_remote_viewer:
-        env = _wrappers.RemoteViewerWrapper(env, websocket_uri=f"ws://{args.viewer_host}:{args.viewer_port}/ws/env")
-        logger.info(f"Remote viewer enabled at {args.viewer_host}:{args.viewer_port}")
+    if args.runtime == "asyncio":
+        if args.num_envs > 1 or args.pipelined:
+            logger.error("The asyncio runtime does not support --num-envs > 1 or --pipelined")
+            return EXIT_INVALID_CONFIG
+        try:
+            return asyncio.run(_run_async(args, encoder, profiler))
+        finally:
+            profiler.close()
 
-    if args.use_real_time:
-        env = _wrappers.RealTimeWrapper(env, fps=args.fps)
-        logger.info(f"Real-time mode enabled at {args.fps} FPS")
+    env = None
+    try:
+        if not vectorized:
+            # Built before connecting and kept across reconnects: starting the simulator is the slow part. An env
+            # that cannot be built fails the same way on every restart, so it counts as a configuration error.
+            try:
+                env = _make_env(args, profiler=profiler if profiler.enabled else None)
+            except Exception as e:
+                logger.opt(exception=e).error(f"Failed to build the env: {e}")
+                return EXIT_INVALID_CONFIG
+        for attempt in range(args.reconnect_attempts + 1):
+            if attempt > 0:
+                delay = args.reconnect_backoff * 2 ** (attempt - 1)
+                logger.warning(f"Reconnecting in {delay:.1f}s ({attempt}/{args.reconnect_attempts})")
+                time.sleep(delay)
+            try: 
+                worker_agent = _make_worker_agent(args)
+                logger.info(f"Connected to server with metadata: {worker_agent.get_server_metadata()}")
+            except Exception as e:
+                logger.error(f"Failed to connect to server: {e}")
+                continue
+
+            try:
+                if vectorized:
+                    _run_vector(args, worker_agent, encoder, profiler, env=vector_env)
+                else:
+                    remaining = dataclasses.replace(args, num_episodes=args.num_episodes - profiler.episode_count)
+                    run = _run_pipelined if args.pipelined else _run_single
+                    run(remaining, worker_agent, encoder, profiler, env=env)
+                return 0
+            except (websockets.ConnectionClosed, ConnectionError) as e:
+                if vectorized:
+                    raise
+                logger.error(f"Lost the connection to the server: {e}")
+            finally:
+                # Before the next agent is built: shm segments stay mapped until the agent is closed.
+                _close_worker_agent(worker_agent)
+        return 1
+    finally:
+        if env is not None:
+            env.close()
+        if vector_env is not None:
+            vector_env.close()
+        profiler.close()
+
+def _log_profile(profiler: StepProfiler, num_steps: int):
+    summary = profiler.end_episode(num_steps)
+    if profiler.enabled:
+        logger.info(f"  Profile: {StepProfiler.format(summary)}")
+
+def _run_single(
+    args: Args, worker_agent: WorkerAgent, encoder: ObservationEncoder, profiler: StepProfiler, env: gym.Env | None = None
+):
+    """Runs `args.num_episodes` episodes. A given `env` is left open; otherwise one is made and closed."""
+    owns_env = env is None
+    if env is None:
+        env = _make_env(args, profiler=profiler if profiler.enabled else None)
+    # Observations are sent before the env steps again, except those kept in batched feedback.
+    channel = _make_feedback_channel(args, worker_agent, encoder, copy_obs=reuses_obs_buffers(env))
+
+    try:
+        for ep in range(args.num_episodes):
+            profiler.begin_episode()
+            with profiler.phase("env.reset"):
+                obs, info = env.reset()
+            encoder.reset()
+            logger.info(f"Episode {ep}:")
+            logger.info("  Info:", info)
+        
+            terminated, truncated = False, False
+            step_count, total_reward = 0, 0.
+        
+            while not (terminated or truncated):
+                with profiler.phase("infer"):
+                    with profiler.phase("encode"):
+                        wire = channel.encode_infer(obs)
+                    action_data = worker_agent.infer(wire)
+                action_chunk = action_data["action"].swapaxes(1, 0)
+                replan_steps = args.replan_steps or len(action_chunk)
+                assert (
+                    len(action_chunk) >= replan_steps
+                ), f"We want to replan every {args.replan_steps} steps, but policy only predicts {len(action_chunk)} steps."
+                # Only the observation at the end of the chunk (or of the episode) is built.
+                with profiler.phase("env.step_chunk"):
+                    obs, rewards, terminated, truncated, info = step_chunk(env, action_chunk[:replan_steps])
+                step_count += len(rewards)
+                total_reward += float(rewards.sum())
+
+                with profiler.phase("feedback"):
+                    with profiler.phase("encode"):
+                        send = channel.prepare(obs, float(rewards[-1]), terminated, truncated, info)
+                    if send is not None:
+                        send()
+
+                logger.debug(f"    Step {step_count}: rewards={rewards}, terminated={terminated}, truncated={truncated}, info={info}")
+
+            logger.info(f"  Episode {ep} finished after {step_count} steps with total reward {total_reward} and info {info}")
+            if encoder.stats:
+                logger.info(f"  Codecs: {encoder.summary()}")
+            _log_profile(profiler, step_count)
+        channel.flush()
+    finally:
+        if owns_env:
+            env.close()
+
+def _find_wrapper(env: gym.Env, wrapper_type: type[gym.Wrapper]) -> gym.Wrapper | None:
+    while isinstance(env, gym.Wrapper):
+        if isinstance(env, wrapper_type):
+            return env
+        env = env.env
+    return None
+
+async def _run_async_episodes(
+    args: Args,
+    worker_agent: AsyncWorkerAgent,
+    encoder: ObservationEncoder,
+    profiler: StepProfiler,
+    env: gym.Env,
+    executor: concurrent.futures.Executor,
+):
+    """Runs `args.num_episodes` episodes of `env` on one connection. Every env call goes through `executor`."""
+    loop = asyncio.get_running_loop()
+    channel = _make_feedback_channel(args, worker_agent, encoder)
+    # Feedback is sent while the env thread moves on, so observations must not change under it.
+    copy_obs = reuses_obs_buffers(env)
 
     for ep in range(args.num_episodes):
-        obs, info = env.reset()
-        action_plan = collections.deque()
+        profiler.begin_episode()
+        with profiler.phase("env.reset"):
+            obs, info = await loop.run_in_executor(executor, env.reset)
+        if copy_obs:
+            obs = copy_observation(obs)
+        encoder.reset()
         logger.info(f"Episode {ep}:")
         logger.info("  Info:", info)
-        
-        reward, terminated, truncated = 0.0, False, False
-        step_count, total_reward, sum_reward = 0, 0., 0.
-        
+
+        terminated, truncated = False, False
+        step_count, total_reward = 0, 0.
+
         while not (terminated or truncated):
+            with profiler.phase("infer"):
+                with profiler.phase("encode"):
+                    wire = channel.encode_infer(obs)
+                action_data = await worker_agent.infer(wire)
+            action_chunk = action_data["action"].swapaxes(1, 0)
+            replan_steps = args.replan_steps or len(action_chunk)
+            assert (
+                len(action_chunk) >= replan_steps
+            ), f"We want to replan every {args.replan_steps} steps, but policy only predicts {len(action_chunk)} steps."
+            with profiler.phase("env.step_chunk"):
+                obs, rewards, terminated, truncated, info = await loop.run_in_executor(
+                    executor, step_chunk, env, action_chunk[:replan_steps]
+                )
+            if copy_obs:
+                obs = copy_observation(obs)
+            step_count += len(rewards)
+            total_reward += float(rewards.sum())
+
+            # Not awaited: the message is sent by the agent's sender task while the loop moves on.
+            with profiler.phase("encode"):
+                channel.feedback(obs, float(rewards[-1]), terminated, truncated, info)
+
+            logger.debug(f"    Step {step_count}: rewards={rewards}, terminated={terminated}, truncated={truncated}, info={info}")
+
+        logger.info(f"  Episode {ep} finished after {step_count} steps with total reward {total_reward} and info {info}")
+        if encoder.stats:
+            logger.info(f"  Codecs: {encoder.summary()}")
+        _log_profile(profiler, step_count)
+    channel.flush()
+
+async def _run_async(args: Args, encoder: ObservationEncoder, profiler: StepProfiler) -> int:
+    loop = asyncio.get_running_loop()
+    # Every env call runs on this one thread: simulators with thread-bound GL contexts expect that.
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="env")
+    env, viewer_task = None, None
+
+    try:
+        # Built before connecting and kept across reconnects, as in the blocking runtimes.
+        try:
+            env = await loop.run_in_executor(
+                executor, functools.partial(_make_env, args, profiler=profiler if profiler.enabled else None, viewer_thread=False)
+            )
+        except Exception as e:
+            logger.opt(exception=e).error(f"Failed to build the env: {e}")
+            return EXIT_INVALID_CONFIG
+        viewer = _find_wrapper(env, _wrappers.RemoteViewerWrapper)
+        viewer_task = loop.create_task(viewer.communicator.run()) if viewer is not None else None
+
+        for attempt in range(args.reconnect_attempts + 1):
+            if attempt > 0:
+                delay = args.reconnect_backoff * 2 ** (attempt - 1)
+                logger.warning(f"Reconnecting in {delay:.1f}s ({attempt}/{args.reconnect_attempts})")
+                await asyncio.sleep(delay)
+            worker_agent = AsyncWorkerAgent(
+                host=args.server_host,
+                port=args.server_port,
+                num_shm_slots=args.shm_slots if args.transport == "shm" else None,
+            )
+            try:
+                try:
+                    logger.info(f"Connected to server with metadata: {await worker_agent.connect()}")
+                except Exception as e:
+                    logger.error(f"Failed to connect to server: {e}")
+                    continue
+                remaining = dataclasses.replace(args, num_episodes=args.num_episodes - profiler.episode_count)
+                await _run_async_episodes(remaining, worker_agent, encoder, profiler, env, executor)
+                return 0
+            except (websockets.ConnectionClosed, ConnectionError) as e:
+                logger.error(f"Lost the connection to the server: {e}")
+            finally:
+                await worker_agent.close()
+        return 1
+    finally:
+        if env is not None:
+            await loop.run_in_executor(executor, env.close)
+        executor.shutdown(wait=True)
+        if viewer_task is not None:
+            # `env.close()` stopped the communicator; let it close the viewer connection cleanly.
+            try:
+                await asyncio.wait_for(viewer_task, timeout=2.0)
+            except asyncio.TimeoutError:
+                pass
+
+def _merge_action_plan(stale: collections.deque, fresh: np.ndarray, mode: Literal["replace", "blend"]) -> collections.deque:
+    """Merges a freshly inferred chunk with the actions left over from the previous one.
+
+    `replace` drops the stale actions. `blend` cross-fades linearly from the stale to the fresh actions over their
+    overlap, which avoids jumps at chunk boundaries for continuous action spaces.
+    """
+    if mode == "replace" or not stale:
+        return collections.deque(fresh)
+    overlap = min(len(stale), len(fresh))
+    weights = np.arange(1, overlap + 1, dtype=np.float32) / (overlap + 1)
+    blended = [
+        ((1.0 - w) * old + w * new).astype(new.dtype)
+        for w, old, new in zip(weights, list(stale)[:overlap], fresh[:overlap])
+    ]
+    return collections.deque([*blended, *fresh[overlap:]])
+
+def _run_pipelined(
+    args: Args, worker_agent: WorkerAgent, encoder: ObservationEncoder, profiler: StepProfiler, env: gym.Env | None = None
+):
+    """Runs `args.num_episodes` episodes. A given `env` is left open; otherwise one is made and closed."""
+    owns_env = env is None
+    if env is None:
+        env = _make_env(args, profiler=profiler if profiler.enabled else None)
+    # The agent connection is not thread-safe, so every request goes through this single thread, in order.
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="infer")
+    # Round-trips are timed on the executor thread; `infer.wait` is the time the step loop stalls on them.
+    infer = profiler.timed("infer", worker_agent.infer)
+    channel = _make_feedback_channel(args, worker_agent, encoder)
+    # Requests are sent from the executor while the env keeps stepping, so observations must not change under them.
+    copy_obs = reuses_obs_buffers(env)
+
+    try:
+        for ep in range(args.num_episodes):
+            profiler.begin_episode()
+            with profiler.phase("env.reset"):
+                obs, info = env.reset()
+            if copy_obs:
+                obs = copy_observation(obs)
+            encoder.reset()
+            action_plan = collections.deque()
+            logger.info(f"Episode {ep}:")
+            logger.info("  Info:", info)
+
+            reward, terminated, truncated = 0.0, False, False
+            step_count, total_reward, stall_count = 0, 0., 0
+            pending, pending_delay = None, 0
+            chunk_step, replan_at = 0, 0
+
+            while not (terminated or truncated):
+                if pending is None and (not action_plan or chunk_step >= replan_at):
+                    # Frame streams are stateful: feedback and infer each need their own encoded message.
+                    with profiler.phase("encode"):
+                        send = channel.prepare(obs, float(reward), terminated, truncated, info) if step_count > 0 else None
+                        if send is not None:
+                            executor.submit(profiler.timed("feedback", send))
+                        pending, pending_delay = executor.submit(infer, channel.encode_infer(obs)), 0
+
+                if pending is not None and (pending.done() or not action_plan):
+                    if not pending.done():
+                        stall_count += 1
+                    with profiler.phase("infer.wait"):
+                        action_chunk = pending.result()["action"].swapaxes(1, 0)
+                    replan_steps = args.replan_steps or len(action_chunk)
+                    assert (
+                        len(action_chunk) >= replan_steps
+                    ), f"We want to replan every {args.replan_steps} steps, but policy only predicts {len(action_chunk)} steps."
+                    # The first `pending_delay` actions of the new chunk were meant for steps already executed.
+                    action_plan = _merge_action_plan(action_plan, action_chunk[pending_delay:], args.chunk_merge)
+                    chunk_step, replan_at = pending_delay, max(1, replan_steps - args.pipeline_lookahead)
+                    pending = None
+                    if not action_plan:
+                        continue
+
+                action = action_plan.popleft()
+                # The observation is used if it triggers the next request at the top of the loop.
+                request_render(env, needed=pending is None and (not action_plan or chunk_step + 1 >= replan_at))
+                with profiler.phase("env.step"):
+                    obs, reward, terminated, truncated, info = env.step(action)
+                if copy_obs and obs is not None:
+                    obs = copy_observation(obs)
+                step_count += 1
+                chunk_step += 1
+                pending_delay += 1
+                total_reward += float(reward)
+
+                if step_count % 100 == 0 or terminated or truncated:
+                    logger.debug(f"    Step {step_count}: reward={reward}, terminated={terminated}, truncated={truncated}, info={info}")
+
+            if pending is not None:
+                pending.result()
+            with profiler.phase("encode"):
+                send = channel.prepare(obs, float(reward), terminated, truncated, info)
+            if send is not None:
+                executor.submit(profiler.timed("feedback", send)).result()
+            logger.info(f"  Episode {ep} finished after {step_count} steps with total reward {total_reward} and info {info}")
+            logger.debug(f"  Waited on the server {stall_count} times")
+            if encoder.stats:
+                logger.info(f"  Codecs: {encoder.summary()}")
+            _log_profile(profiler, step_count)
+        send = channel.prepare_flush()
+        if send is not None:
+            executor.submit(send).result()
+    finally:
+        executor.shutdown(wait=True)
+        if owns_env:
+            env.close()
+
+def _run_vector(
+    args: Args, worker_agent: WorkerAgent, encoder: ObservationEncoder, profiler: StepProfiler, env=None
+):
+    """Runs `args.num_episodes` episodes over a vector env. A given `env` (a native vector env) is left open;
+    otherwise `args.num_envs` subprocesses are started and closed."""
+    owns_env = env is None
+    if env is None:
+        env = SubprocVectorEnv([functools.partial(_make_env, args, rank) for rank in range(args.num_envs)])
+    logger.info(f"Running {env.num_envs} envs in lockstep")
+    channel = _make_feedback_channel(args, worker_agent, encoder)
+
+    try:
+        # The envs step in subprocesses, so wrapper overheads are not profiled; the run is reported as one episode.
+        profiler.begin_episode()
+        with profiler.phase("env.reset"):
+            obs, infos = env.reset()
+        action_plan = collections.deque()
+        episode_count, step_count = 0, 0
+
+        while episode_count < args.num_episodes:
             if not action_plan:
-                sum_reward += float(reward)
-                action_data = worker_agent.infer(dataclasses.asdict(obs))
+                with profiler.phase("infer"):
+                    with profiler.phase("encode"):
+                        wire = channel.encode_infer(obs)
+                    action_data = worker_agent.infer(wire)
+                # (b, t, da) -> (t, b, da): every step of the plan holds one action per env.
                 action_chunk = action_data["action"].swapaxes(1, 0)
                 replan_steps = args.replan_steps or len(action_chunk)
                 assert (
                     len(action_chunk) >= replan_steps
                 ), f"We want to replan every {args.replan_steps} steps, but policy only predicts {len(action_chunk)} steps."
-                action_plan.extend(action_chunk)
-            action = action_plan.popleft()
-            obs, reward, terminated, truncated, info = env.step(action)
+                action_plan.extend(action_chunk[:replan_steps])
+            actions = action_plan.popleft()
+            with profiler.phase("env.step"):
+                obs, rewards, terminated, truncated, infos = env.step(actions)
             step_count += 1
-            total_reward += float(reward)        
-            sum_reward += float(reward)
+            dones = terminated | truncated
 
-            if not action_plan or terminated or truncated:
-                worker_agent.feedback(dataclasses.asdict(obs), float(reward), terminated, truncated, info)
+            if not action_plan or dones.any():
+                # Finished envs were auto-reset, so their remaining actions belong to a stale episode:
+                # drop the plan and replan for the whole batch.
+                action_plan.clear()
+                feedback_obs = env.final_observation(obs, infos)
+                feedback_infos = [{k: v for k, v in info.items() if k != "final_obs"} for info in infos]
+                with profiler.phase("feedback"):
+                    with profiler.phase("encode"):
+                        send = channel.prepare(feedback_obs, rewards, terminated, truncated, feedback_infos)
+                    if send is not None:
+                        send()
 
-            if step_count % 100 == 0 or terminated or truncated:
-                logger.debug(f"    Step {step_count}: reward={reward}, terminated={terminated}, truncated={truncated}, info={info}")
+            for i in np.flatnonzero(dones):
+                # Envs finishing in the same step as the last counted episode are not logged.
+                if episode_count == args.num_episodes:
+                    break
+                episode_count += 1
+                logger.info(f"  Env {i} finished an episode ({episode_count}/{args.num_episodes}) with info {infos[i].get('episode')}")
 
-        logger.info(f"  Episode {ep} finished after {step_count} steps with total reward {total_reward} and info {info}")
+            if step_count % 100 == 0:
+                logger.debug(f"    Step {step_count}: rewards={rewards}, terminated={terminated}, truncated={truncated}")
+
+        if encoder.stats:
+            logger.info(f"  Codecs: {encoder.summary()}")
+        _log_profile(profiler, step_count * env.num_envs)
+        channel.flush()
+    finally:
+        if owns_env:
+            env.close()
     
 def main():
-    _main(cli())
\ No newline at end of file
+    sys.exit(_main(cli()))
\ No newline at end of file
@@ -1,16 +1,25 @@
+import importlib
+
+from vlarl_infra.utils.registration import LAZY_ENVS, register_env_entry_point
 from .dummy_env import DummyEnv
+from .vector_env import SubprocVectorEnv
+
+# Only the lightweight config modules are imported here; each simulator is imported when its env is selected.
+from .classic.config import ClassicConfig
+from .robomimic.config import RobomimicConfig
+from .atari.config import AtariConfig
+from .replay.config import ReplayConfig
 
-try:
-    from .classic.classic_env import ClassicEnv
-except ImportError:
-    pass
+# pygame is only needed by the default `--env.render-mode pygame`.
+register_env_entry_point("Classic-v1", "vlarl_infra.envs.classic.classic_env:ClassicEnv")
+register_env_entry_point("Robomimic-v1", "vlarl_infra.envs.robomimic.robomimic_env:RobomimicEnv", requires=("robomimic", "robosuite"))
+register_env_entry_point("Atari-v1", "vlarl_infra.envs.atari.atari_env:AtariEnv", requires=("ale_py",))
+register_env_entry_point("Replay-v1", "vlarl_infra.envs.replay.replay_env:ReplayEnv")
 
-try:
-    from .robomimic.robomimic_env import RobomimicEnv
-except ImportError:
-    pass
+_LAZY_CLASSES = {entry.entry_point.split(":")[1]: entry.entry_point for entry in LAZY_ENVS.values()}
 
-try:
-    from .atari.atari_env import AtariEnv
-except ImportError:
-    pass
\ No newline at end of file
+def __getattr__(name: str):
+    if name in _LAZY_CLASSES:
+        module_name, _, attr = _LAZY_CLASSES[name].partition(":")
+        return getattr(importlib.import_module(module_name), attr)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,4 +1,3 @@
-import dataclasses
 import numpy as np
 import gymnasium as gym
 
@@ -6,38 +5,46 @@ try:
     import ale_py
     gym.register_envs(ale_py)
     from .atari_wrappers import *
+    from .preprocessing import FusedAtariPreprocessing
 except ImportError:
     raise ImportError(
         "Atari is not installed. Please install it with the 'atari' extra, e.g. 'pip install vlarl_infra[atari]'"
     )
-from vlarl_infra.envs.base_env import BaseEnv, BaseEnvConfig, Action, Observation
-from vlarl_infra.utils.registration import register_env, register_env_config
+from vlarl_infra.envs.base_env import BaseEnv, Action, Observation
+from vlarl_infra.envs.atari.config import UID, AtariConfig
+from vlarl_infra.utils.registration import register_env
 
-UID = "Atari-v1"
-
-@register_env_config(UID)
-@dataclasses.dataclass
-class AtariConfig(BaseEnvConfig):
-    name: str = "BreakoutNoFrameskip-v4"
-    
 @register_env(UID)
 class AtariEnv(BaseEnv):
     env: gym.Env
     
     def __init__(self, config: AtariConfig):
         super().__init__(config=config)
-        env = gym.make(config.name, render_mode="rgb_array")
-        env = NoopResetEnv(env, noop_max=30)
-        env = MaxAndSkipEnv(env, skip=4)
-        env = EpisodicLifeEnv(env)
-        if "FIRE" in env.unwrapped.get_action_meanings():
-            env = FireResetEnv(env)
-        env = gym.wrappers.ResizeObservation(env, (84, 84))
-        env = gym.wrappers.GrayscaleObservation(env)
-        env = gym.wrappers.FrameStackObservation(env, 4)
+        if config.preprocessing == "fused":
+            env = FusedAtariPreprocessing(gym.make(config.name, render_mode="rgb_array"))
+            # Observations are views into the wrapper's frame ring.
+            self.reuses_obs_buffers = True
+        else:
+            env = gym.make(config.name, render_mode="rgb_array")
+            env = NoopResetEnv(env, noop_max=30)
+            env = MaxAndSkipEnv(env, skip=4)
+            env = EpisodicLifeEnv(env)
+            if "FIRE" in env.unwrapped.get_action_meanings():
+                env = FireResetEnv(env)
+            env = gym.wrappers.ResizeObservation(env, (84, 84))
+            env = gym.wrappers.GrayscaleObservation(env)
+            env = gym.wrappers.FrameStackObservation(env, 4)
         self.env = env
         self.game_name = config.name
         
+    @classmethod
+    def make_vector_env(cls, config: AtariConfig, max_episode_steps: int | None = None):
+        if config.backend != "ale-vector":
+            return None
+        # Imported here: the python backend also works with ale-py releases that have no vector env.
+        from vlarl_infra.envs.atari.vector_env import ALEVectorEnv
+        return ALEVectorEnv(config, max_episode_steps=max_episode_steps)
+
     def prepare_obs(self, obs: np.ndarray) -> Observation:
         frames = {
             f"{i}": obs[i:i+1, :, :, None] for i in range(obs.shape[0])
@@ -55,4 +62,5 @@ class AtariEnv(BaseEnv):
     def step(self, action: Action) -> tuple[Observation | None, float, bool, bool, dict]:
         action = int(action.item())
         obs, reward, terminated, truncated, info = self.env.step(action)
-        return self.prepare_obs(obs), float(reward), terminated, truncated, info
\ No newline at end of file
+        observation = self.prepare_obs(obs) if self._take_render_hint(terminated or truncated) else None
+        return observation, float(reward), terminated, truncated, info
\ No newline at end of file
@@ -0,0 +1,21 @@
+import dataclasses
+from typing import Literal
+
+from vlarl_infra.envs.base_env import BaseEnvConfig
+from vlarl_infra.utils.registration import register_env_config
+
+UID = "Atari-v1"
+
+@register_env_config(UID)
+@dataclasses.dataclass
+class AtariConfig(BaseEnvConfig):
+    name: str = "BreakoutNoFrameskip-v4"
+    # `fused` preprocesses frames in one allocation-free wrapper (`FusedAtariPreprocessing`, needs OpenCV);
+    # `wrappers` uses the original chain of gymnasium and stable-baselines3 wrappers.
+    preprocessing: Literal["fused", "wrappers"] = "fused"
+    # `ale-vector` steps `num_envs` games in the ALE's C++ threads with ale_py's `AtariVectorEnv` (ale-py >= 0.11),
+    # which does the preprocessing itself; the worker sends their observations batched, as with --num-envs.
+    backend: Literal["python", "ale-vector"] = "python"
+    num_envs: int = 1
+    # Threads of the `ale-vector` backend, 0 for one per env.
+    num_threads: int = 0
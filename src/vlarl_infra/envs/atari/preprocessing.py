@@ -0,0 +1,157 @@
+"""Atari preprocessing in a single wrapper that drives the ALE directly.
+
+`FusedAtariPreprocessing` does the work of the `NoopResetEnv` -> `MaxAndSkipEnv` -> `EpisodicLifeEnv` ->
+`FireResetEnv` -> `ResizeObservation` -> `GrayscaleObservation` -> `FrameStackObservation` chain without allocating
+per step: the ALE writes RGB screens into preallocated buffers (only the last two frames of every skip), they are
+max-pooled in place, resized by OpenCV into a small buffer, and converted to grayscale straight into a ring buffer
+that holds the frame stack. Every step does the same arithmetic as the chain, so the frames are bit-identical.
+"""
+from typing import Any
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None  # type: ignore[assignment]
+
+# Luminance weights of `gymnasium.wrappers.GrayscaleObservation`.
+_GRAY_WEIGHTS = (0.2125, 0.7154, 0.0721)
+
+
+class FusedAtariPreprocessing(gym.Wrapper[np.ndarray, int, np.ndarray, int]):
+    """Noop reset, frame skipping with max-pooling, end of life as end of episode, fire on reset, grayscale,
+    resize to `screen_size` with INTER_AREA and a stack of the last `stack_size` frames, oldest first.
+
+    `env` must be an unwrapped-enough ALE env with `frameskip=1`, e.g. `gym.make("BreakoutNoFrameskip-v4")`.
+
+    Observations are views into the ring buffer: they are only valid until the next `step` or `reset`, and must
+    be copied to be kept longer. Each frame is written twice, at slot `i` and `i + stack_size`, so the stack is
+    always the contiguous slice that ends at the newest frame.
+    """
+
+    def __init__(
+        self,
+        env: gym.Env,
+        noop_max: int = 30,
+        frame_skip: int = 4,
+        screen_size: int = 84,
+        stack_size: int = 4,
+        terminal_on_life_loss: bool = True,
+    ):
+        super().__init__(env)
+        if cv2 is None:
+            raise ImportError("OpenCV is not installed, you can do `pip install opencv-python-headless`")
+        assert getattr(env.unwrapped, "_frameskip", 1) == 1, "The ALE env must not skip frames itself"
+        self.noop_max = noop_max
+        self.frame_skip = frame_skip
+        self.screen_size = screen_size
+        self.stack_size = stack_size
+        self.terminal_on_life_loss = terminal_on_life_loss
+
+        self.ale = env.unwrapped.ale  # type: ignore[attr-defined]
+        self._action_set = env.unwrapped._action_set  # type: ignore[attr-defined]
+        meanings = env.unwrapped.get_action_meanings()  # type: ignore[attr-defined]
+        assert meanings[0] == "NOOP"
+        self._fire_reset = len(meanings) >= 3 and meanings[1] == "FIRE"
+
+        height, width = self.ale.getScreenDims()
+        # The last two raw RGB frames of a skip; the pooled frame ends up in `_screens[0]`.
+        self._screens = np.zeros((2, height, width, 3), dtype=np.uint8)
+        # The resized RGB frame and the float64 buffers of `GrayscaleObservation`'s weighted sum.
+        self._resized = np.zeros((screen_size, screen_size, 3), dtype=np.uint8)
+        self._gray = np.zeros((screen_size, screen_size), dtype=np.float64)
+        self._term = np.zeros((screen_size, screen_size), dtype=np.float64)
+        self._stack = np.zeros((2 * stack_size, screen_size, screen_size), dtype=np.uint8)
+        self._slot = 0
+        self.lives = 0
+        self.was_real_done = True
+        self.observation_space = spaces.Box(
+            low=0, high=255, shape=(stack_size, screen_size, screen_size), dtype=np.uint8
+        )
+
+    def _info(self) -> dict:
+        return {
+            "lives": self.ale.lives(),
+            "episode_frame_number": self.ale.getEpisodeFrameNumber(),
+            "frame_number": self.ale.getFrameNumber(),
+        }
+
+    def _skip(self, action: int) -> float:
+        """Repeats `action` for `frame_skip` frames and max-pools the last two into `_screens[0]`."""
+        ale_action = self._action_set[action]
+        reward = 0.0
+        for i in range(self.frame_skip):
+            reward += self.ale.act(ale_action)
+            # As in `MaxAndSkipEnv`, the frames of a skip cut short by the end of the game do not matter.
+            if i >= self.frame_skip - 2:
+                self.ale.getScreenRGB(self._screens[i - self.frame_skip + 2])
+            if self.ale.game_over():
+                break
+        if self.frame_skip > 1:
+            np.maximum(self._screens[0], self._screens[1], out=self._screens[0])
+        else:
+            self._screens[0] = self._screens[1]
+        return reward
+
+    def _reset_game(self, **kwargs):
+        self.env.reset(**kwargs)
+        noops = self.unwrapped.np_random.integers(1, self.noop_max + 1) if self.noop_max > 0 else 0
+        for _ in range(noops):
+            self.ale.act(self._action_set[0])
+            if self.ale.game_over():
+                self.env.reset(**kwargs)
+        self.ale.getScreenRGB(self._screens[0])
+
+    def _grayscale(self, out: np.ndarray):
+        # sum(rgb * (0.2125, 0.7154, 0.0721)) truncated to uint8, in the order `GrayscaleObservation` computes it.
+        resized = self._resized
+        np.multiply(resized[..., 0], _GRAY_WEIGHTS[0], out=self._gray)
+        for channel in (1, 2):
+            np.multiply(resized[..., channel], _GRAY_WEIGHTS[channel], out=self._term)
+            self._gray += self._term
+        np.copyto(out, self._gray, casting="unsafe")
+
+    def _push_frame(self, fill: bool = False) -> np.ndarray:
+        slot = self._slot
+        cv2.resize(
+            self._screens[0], (self.screen_size, self.screen_size), dst=self._resized, interpolation=cv2.INTER_AREA
+        )
+        self._grayscale(self._stack[slot])
+        if fill:
+            self._stack[:] = self._stack[slot]
+        else:
+            self._stack[slot + self.stack_size] = self._stack[slot]
+        self._slot = (slot + 1) % self.stack_size
+        return self._stack[slot + 1:slot + 1 + self.stack_size]
+
+    def reset(self, *, seed: int | None = None, options: dict[str, Any] | None = None) -> tuple[np.ndarray, dict]:
+        kwargs = dict(seed=seed, options=options)
+        if self.was_real_done or not self.terminal_on_life_loss:
+            self._reset_game(**kwargs)
+        else:
+            # No-op step to advance from the lost life; it can end the game, which then needs a real reset.
+            self._skip(0)
+            if self.ale.game_over():
+                self._reset_game(**kwargs)
+        if self._fire_reset:
+            for action in (1, 2):
+                self._skip(action)
+                if self.ale.game_over():
+                    self._reset_game(**kwargs)
+        self.lives = self.ale.lives()
+        self.was_real_done = False
+        return self._push_frame(fill=True), self._info()
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, bool, dict]:
+        reward = self._skip(int(action))
+        terminated = self.ale.game_over(with_truncation=False)
+        truncated = self.ale.game_truncated()
+        self.was_real_done = terminated or truncated
+        lives = self.ale.lives()
+        if self.terminal_on_life_loss and 0 < lives < self.lives:
+            terminated = True
+        self.lives = lives
+        return self._push_frame(), reward, terminated, truncated, self._info()
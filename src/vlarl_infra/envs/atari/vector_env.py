@@ -0,0 +1,87 @@
+"""`ale-vector` backend of `atari-v1`: ale_py's native `AtariVectorEnv` behind the `SubprocVectorEnv` interface."""
+import gymnasium as gym
+import numpy as np
+
+try:
+    from ale_py.vector_env import AtariVectorEnv
+except ImportError:
+    raise ImportError("The ale-vector backend needs ale-py >= 0.11, e.g. 'pip install -U ale-py'")
+
+from vlarl_infra.envs.atari.config import AtariConfig
+from vlarl_infra.envs.base_env import Action, Observation
+from vlarl_infra.envs.vector_env import EpisodeStatistics, final_observation
+
+
+class ALEVectorEnv:
+    """Steps `config.num_envs` games in the ALE's C++ thread pool and returns batched observations.
+
+    The ALE does the preprocessing of `AtariEnv` itself: 30 random no-ops and fire on reset, 4 skipped frames
+    max-pooled, grayscale 84x84 frames stacked by 4, and losing a life ends the episode. Finished envs are reset in
+    the same step; their final observation is kept in `infos[i]["final_obs"]`, and `infos[i]["episode"]` holds the
+    return and length of the episode.
+    """
+    num_envs: int
+
+    def __init__(self, config: AtariConfig, max_episode_steps: int | None = None):
+        spec = gym.spec(config.name)
+        frame_skip = 4
+        max_frames = spec.kwargs.get("max_num_frames_per_episode", 108000)
+        if max_episode_steps is not None:
+            max_frames = min(max_frames, max_episode_steps * frame_skip)
+        self.env = AtariVectorEnv(
+            spec.kwargs["game"],
+            config.num_envs,
+            num_threads=config.num_threads,
+            autoreset_mode="SameStep",
+            max_num_frames_per_episode=max_frames,
+            repeat_action_probability=spec.kwargs.get("repeat_action_probability", 0.0),
+            full_action_space=spec.kwargs.get("full_action_space", False),
+            frameskip=frame_skip,
+            noop_max=30,
+            episodic_life=True,
+            reward_clipping=False,
+            use_fire_reset=True,
+        )
+        self.num_envs = config.num_envs
+        self.game_name = config.name
+        self.stats = EpisodeStatistics(self.num_envs)
+
+    def prepare_obs(self, obs: np.ndarray) -> Observation:
+        # (b, stack, h, w) -> one contiguous (b, h, w, 1) array per stacked frame, as `AtariEnv` sends them.
+        frames = np.ascontiguousarray(obs.swapaxes(0, 1))[..., None]
+        return Observation(images={f"{i}": frames[i] for i in range(len(frames))}, states={}, text=self.game_name)
+
+    def _infos(self, info: dict) -> list[dict]:
+        keys = ("lives", "episode_frame_number", "frame_number")
+        return [{k: int(info[k][i]) for k in keys if k in info} for i in range(self.num_envs)]
+
+    def reset(self, *, seed: int | None = None) -> tuple[Observation, list[dict]]:
+        obs, info = self.env.reset(seed=seed)
+        self.stats.reset()
+        return self.prepare_obs(obs), self._infos(info)
+
+    def step(self, actions: Action) -> tuple[Observation, np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        assert len(actions) == self.num_envs, f"Expected {self.num_envs} actions, got {len(actions)}"
+        obs, rewards, terminated, truncated, info = self.env.step(np.asarray(actions).reshape(self.num_envs).astype(np.int64))
+        infos = self._infos(info)
+        episodes = self.stats.update(rewards, terminated | truncated)
+        if episodes:
+            final_obs = self.prepare_obs(info["final_obs"])
+            for i, episode in episodes.items():
+                infos[i]["final_obs"] = Observation(
+                    images={k: v[i:i+1] for k, v in final_obs.images.items()}, states={}, text=self.game_name
+                )
+                infos[i]["episode"] = episode
+        return (
+            self.prepare_obs(obs),
+            rewards.astype(np.float32),
+            terminated.astype(bool),
+            truncated.astype(bool),
+            infos,
+        )
+
+    def final_observation(self, obs: Observation, infos: list[dict]) -> Observation:
+        return final_observation(obs, infos)
+
+    def close(self):
+        self.env.close()
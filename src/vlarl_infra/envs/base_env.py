@@ -1,7 +1,7 @@
 import abc
 import dataclasses
 
-from typing import Dict, Annotated, TypeVar
+from typing import Dict, Annotated, Sequence, TypeVar
 import numpy.typing as npt
 
 import numpy as np
@@ -17,17 +17,126 @@ class Observation:
     images: Dict[str, ImageArray]
     states: Dict[str, StateArray]
     text: str
+
+    def to_wire(self) -> dict:
+        """Returns a shallow dict view of the observation for serialization.
+
+        Unlike `dataclasses.asdict`, the arrays are not copied: the serializer reads the original buffers.
+        The result is only valid until the env produces the next observation.
+        """
+        return {"images": dict(self.images), "states": dict(self.states), "text": self.text}
+
+    @classmethod
+    def from_wire(cls, data: dict) -> "Observation":
+        """Inverse of `to_wire`; arrays decoded from a message keep pointing at the message buffer."""
+        return cls(images=dict(data["images"]), states=dict(data["states"]), text=data["text"])
+    
+def concatenate_observations(observations: Sequence[Observation]) -> Observation:
+    """Concatenates observations along the leading batch dimension.
+
+    All observations are expected to come from the same env config, so the text of the first one is kept.
+    """
+    first = observations[0]
+    return Observation(
+        images={k: np.concatenate([obs.images[k] for obs in observations], axis=0) for k in first.images},
+        states={k: np.concatenate([obs.states[k] for obs in observations], axis=0) for k in first.states},
+        text=first.text,
+    )
+
+def split_observation(obs: Observation) -> list[Observation]:
+    """Splits a batched observation into batch-size-1 views, one per row."""
+    batch_size = next(iter(obs.images.values() or obs.states.values())).shape[0]
+    return [
+        Observation(
+            images={k: v[i:i+1] for k, v in obs.images.items()},
+            states={k: v[i:i+1] for k, v in obs.states.items()},
+            text=obs.text,
+        )
+        for i in range(batch_size)
+    ]
     
 Action = Annotated[npt.NDArray[DType], ("b", "da")]
 
+def request_render(env: gym.Env, needed: bool = True, capture: bool = False):
+    """`BaseEnv.request_render` on the env under `env`'s wrappers, if it is a `BaseEnv`.
+
+    The step loop calls it before every step; wrappers that need the observation call it again in their own `step`,
+    before stepping the env they wrap, to raise the hint.
+    """
+    base = env
+    while isinstance(base, gym.Wrapper):
+        # The env cannot tell that a `TimeLimit` above it ends the episode, and the last observation is always used.
+        if isinstance(base, gym.wrappers.TimeLimit) and base._elapsed_steps is not None:
+            needed = needed or base._elapsed_steps + 1 >= base._max_episode_steps
+        base = base.env
+    if isinstance(base, BaseEnv):
+        base.request_render(needed, capture)
+
+def reuses_obs_buffers(env: gym.Env) -> bool:
+    """`BaseEnv.reuses_obs_buffers` of the env under `env`'s wrappers; False if it is not a `BaseEnv`."""
+    return isinstance(env.unwrapped, BaseEnv) and env.unwrapped.reuses_obs_buffers
+
+def copy_observation(obs: Observation) -> Observation:
+    """An observation that owns its arrays, e.g. to keep one from an env that `reuses_obs_buffers`."""
+    return Observation(
+        images={k: v.copy() for k, v in obs.images.items()},
+        states={k: v.copy() for k, v in obs.states.items()},
+        text=obs.text,
+    )
+
+def step_chunk(env: gym.Env, actions: Sequence[Action]) -> tuple[Observation | None, np.ndarray, bool, bool, dict]:
+    """Executes an action chunk and returns the last observation, the reward of every step, and the flags and info
+    of the last step. Stops early when the episode ends.
+
+    Every step goes through `env`'s wrappers, so time limits and episode statistics stay correct, but only the last
+    observation is requested (see `request_render`): envs that honour the hint skip building the others.
+    """
+    rewards = []
+    obs, terminated, truncated, info = None, False, False, {}
+    for i, action in enumerate(actions):
+        request_render(env, needed=i == len(actions) - 1)
+        obs, reward, terminated, truncated, info = env.step(action)
+        rewards.append(float(reward))
+        if terminated or truncated:
+            break
+    return obs, np.asarray(rewards), terminated, truncated, info
+
 @dataclasses.dataclass
 class BaseEnvConfig:
     max_episode_steps: int | None = None
 
 class BaseEnv(gym.Env, abc.ABC):    
+    # Render hints for the next `step`, see `request_render`.
+    render_requested: bool = True
+    capture_requested: bool = False
+    # Whether observations are views into buffers that the next `step` or `reset` overwrites. Callers that keep an
+    # observation longer, e.g. while a background thread sends it, must copy it first (`copy_observation`).
+    reuses_obs_buffers: bool = False
+
     def __init__(self, config: BaseEnvConfig):
         ...
 
+    def request_render(self, needed: bool = True, capture: bool = False):
+        """Hints whether the observation returned by the next `step` will be used, and whether a full-resolution
+        capture of it is wanted. Envs may skip building an observation that is not needed and return None instead,
+        except on the last step of an episode; others ignore the hints. See `_take_render_hint`."""
+        self.render_requested = needed
+        self.capture_requested = self.capture_requested or capture
+
+    @classmethod
+    def make_vector_env(cls, config: BaseEnvConfig, max_episode_steps: int | None = None):
+        """A native vector env stepping a batch of instances of this env in one process, with the interface of
+        `SubprocVectorEnv`, or None if `config` does not ask for one. The worker then uses it in place of
+        `--num-envs` subprocesses."""
+        return None
+
+    def _take_render_hint(self, done: bool = False) -> bool:
+        """For envs that honour render hints: whether this step's observation must be built. Resets the hints, so
+        the next step builds its observation unless asked otherwise."""
+        needed = self.render_requested or done
+        self.render_requested, self.capture_requested = True, False
+        return needed
+
     @abc.abstractmethod
     def reset(self, *, seed: int | None = None, options: dict | None = None) -> tuple[Observation | None, dict]:
         ...
@@ -1,37 +1,37 @@
-import dataclasses
+import importlib.util
+
 import numpy as np
 import gymnasium as gym
 
-try:
-    import pygame
-except ImportError:
-    raise ImportError('pygame is not installed. Please install it with pip install "vlarl-infra[classic]".')
-
-from vlarl_infra.envs.base_env import BaseEnv, BaseEnvConfig, Action, Observation
-from vlarl_infra.utils.registration import register_env, register_env_config
-
-UID = "Classic-v1"
+from vlarl_infra.envs.base_env import BaseEnv, Action, Observation
+from vlarl_infra.envs.classic.config import UID, ClassicConfig
+from vlarl_infra.envs.classic.raster import ClassicFrames
+from vlarl_infra.envs.classic.vector_env import ClassicVectorEnv, env_action
+from vlarl_infra.utils.registration import register_env
 
-@register_env_config(UID)
-@dataclasses.dataclass
-class ClassicConfig(BaseEnvConfig):
-    classic_env_name: str = "CartPole-v1"
-    
 @register_env(UID)
 class ClassicEnv(BaseEnv):
     env: gym.Env
     
     def __init__(self, config: ClassicConfig):
         super().__init__(config=config)
-        env = gym.make(config.classic_env_name, render_mode="rgb_array")
+        # Only gymnasium's renderer needs pygame; `raster` and `off` run without it.
+        if config.render_mode == "pygame" and importlib.util.find_spec("pygame") is None:
+            raise ImportError('pygame is not installed. Please install it with pip install "vlarl-infra[classic]".')
+        env = gym.make(config.classic_env_name, render_mode="rgb_array" if config.render_mode == "pygame" else None)
         self.env = env
         self.game_name = config.classic_env_name
+        self.frames = ClassicFrames(config, env)
+
+    @classmethod
+    def make_vector_env(cls, config: ClassicConfig, max_episode_steps: int | None = None):
+        if config.num_envs == 1:
+            return None
+        return ClassicVectorEnv(config, max_episode_steps=max_episode_steps)
         
-    def prepare_obs(self, obs: np.ndarray) -> Observation:
-        frame = self.env.render()
-        frames = {
-            f"env": np.array(frame)[None, ...]
-        }
+    def prepare_obs(self, obs: np.ndarray, fresh: bool = False) -> Observation:
+        frame = self.frames.frame(obs, fresh=fresh)
+        frames = {"env": frame[None, ...]} if frame is not None else {}
         states = {"obs": obs[None, ...]}
         return Observation(
             images=frames,
@@ -41,9 +41,12 @@ class ClassicEnv(BaseEnv):
         
     def reset(self, *, seed: int | None = None, options: dict | None = None) -> tuple[Observation | None, dict]:
         obs, info = self.env.reset(seed=seed, options=options)
-        return self.prepare_obs(obs), info
+        return self.prepare_obs(obs, fresh=True), info
     
     def step(self, action: Action) -> tuple[Observation | None, float, bool, bool, dict]:
-        action = int(action.item())
-        obs, reward, terminated, truncated, info = self.env.step(action)
-        return self.prepare_obs(obs), float(reward), terminated, truncated, info
\ No newline at end of file
+        obs, reward, terminated, truncated, info = self.env.step(env_action(self.env.action_space, action))
+        self.frames.step()
+        # Skipping the observation also skips rendering, the costly part.
+        done = terminated or truncated
+        observation = self.prepare_obs(obs, fresh=done) if self._take_render_hint(done) else None
+        return observation, float(reward), terminated, truncated, info
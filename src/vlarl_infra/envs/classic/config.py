@@ -0,0 +1,38 @@
+import dataclasses
+from typing import Literal
+
+from vlarl_infra.envs.base_env import BaseEnvConfig
+from vlarl_infra.utils.registration import register_env_config
+
+UID = "Classic-v1"
+# Env id prefixes with a numpy rasterizer, see `raster.RASTERIZERS`.
+RASTER_ENVS = ("CartPole", "Pendulum", "MountainCar")
+
+@register_env_config(UID)
+@dataclasses.dataclass
+class ClassicConfig(BaseEnvConfig):
+    classic_env_name: str = "CartPole-v1"
+    # How the `env` image is built: `pygame` with gymnasium's renderer, `raster` with numpy only (CartPole, Pendulum
+    # and MountainCar, see `raster.py`), `off` leaves it out and sends the state only.
+    render_mode: Literal["pygame", "raster", "off"] = "pygame"
+    # Render a new frame at most every `render_every` steps; the observations in between repeat the last frame.
+    render_every: int = 1
+    # (height, width) of the `env` image, e.g. 84 84; None keeps the renderer's size (400x600 for CartPole).
+    image_size: tuple[int, int] | None = None
+    # Step `num_envs` envs in this process with `gym.vector.SyncVectorEnv` (`raster` or `off` rendering); the worker
+    # sends their observations batched, as with --num-envs.
+    num_envs: int = 1
+
+    def __post_init__(self):
+        # Checked here so that tyro reports bad combinations as usage errors (exit code 2).
+        if self.render_mode == "raster" and not self.classic_env_name.startswith(RASTER_ENVS):
+            raise ValueError(
+                f"--env.render-mode raster supports {', '.join(RASTER_ENVS)}, not {self.classic_env_name}; "
+                "use pygame or off"
+            )
+        if self.render_mode == "pygame" and self.num_envs > 1:
+            raise ValueError("--env.num-envs > 1 needs --env.render-mode raster or off")
+        if self.render_every < 1 or self.num_envs < 1:
+            raise ValueError("render_every and num_envs must be at least 1")
+        if self.image_size is not None and min(self.image_size) < 1:
+            raise ValueError(f"image_size must be positive, got {self.image_size}")
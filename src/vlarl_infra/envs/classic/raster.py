@@ -0,0 +1,184 @@
+"""Frames of `classic-v1`: numpy rasterizers for CartPole, Pendulum and MountainCar, and `ClassicFrames`.
+
+They draw the same scenes as the gymnasium renderers from the observation alone, with simplified shapes (thick
+lines with round caps instead of rotated polygons, no anti-aliasing, no Pendulum torque arrow). Every shape only
+touches the pixels of its bounding box, so a frame costs little more than filling the background, at any size.
+Since they only need the observation, final observations of vector envs, which are reset in the same step, can be
+drawn as well.
+"""
+from typing import Callable
+
+import gymnasium as gym
+import numpy as np
+from PIL import Image
+
+Rasterizer = Callable[[gym.Env, np.ndarray, int, int], np.ndarray]
+
+
+class _Canvas:
+    """An RGB image addressed in the y-up coordinates of the gymnasium renderer's screen, scaled to the image size."""
+
+    def __init__(self, height: int, width: int, screen_height: float, screen_width: float):
+        self.image = np.full((height, width, 3), 255, dtype=np.uint8)
+        self.sx = width / screen_width
+        self.sy = height / screen_height
+        self.screen_height = screen_height
+
+    def _pixels(self, x: float, y: float) -> tuple[float, float]:
+        return x * self.sx, (self.screen_height - y) * self.sy
+
+    def segment(self, p0: tuple[float, float], p1: tuple[float, float], half_width: float, color: tuple[int, int, int]):
+        """Fills the pixels within `half_width` of the segment from `p0` to `p1`."""
+        (c0, r0), (c1, r1) = self._pixels(*p0), self._pixels(*p1)
+        hw = max(half_width * (self.sx + self.sy) / 2, 0.5)
+        height, width = self.image.shape[:2]
+        rmin, rmax = max(int(min(r0, r1) - hw), 0), min(int(max(r0, r1) + hw) + 1, height)
+        cmin, cmax = max(int(min(c0, c1) - hw), 0), min(int(max(c0, c1) + hw) + 1, width)
+        if rmin >= rmax or cmin >= cmax:
+            return
+        rows = np.arange(rmin, rmax, dtype=np.float32)[:, None] + 0.5
+        cols = np.arange(cmin, cmax, dtype=np.float32)[None, :] + 0.5
+        dc, dr = c1 - c0, r1 - r0
+        length2 = dc * dc + dr * dr
+        t = np.clip(((cols - c0) * dc + (rows - r0) * dr) / length2, 0.0, 1.0) if length2 > 0 else 0.0
+        dist2 = (cols - c0 - t * dc) ** 2 + (rows - r0 - t * dr) ** 2
+        self.image[rmin:rmax, cmin:cmax][dist2 <= hw * hw] = color
+
+    def disc(self, center: tuple[float, float], radius: float, color: tuple[int, int, int]):
+        self.segment(center, center, radius, color)
+
+    def rect(self, x0: float, y0: float, x1: float, y1: float, color: tuple[int, int, int]):
+        (c0, r1), (c1, r0) = self._pixels(x0, y0), self._pixels(x1, y1)
+        height, width = self.image.shape[:2]
+        self.image[max(round(r0), 0):min(max(round(r1), round(r0) + 1), height),
+                   max(round(c0), 0):min(max(round(c1), round(c0) + 1), width)] = color
+
+    def curve(self, fn: Callable[[np.ndarray], np.ndarray], color: tuple[int, int, int]):
+        """Draws the graph y = fn(x) of a function of the screen's x coordinate. Each image column is filled between
+        the rows of the graph at its left and right edges, so steep parts stay connected."""
+        height, width = self.image.shape[:2]
+        rows = (self.screen_height - fn(np.arange(width + 1) / self.sx)) * self.sy
+        low = np.clip(np.floor(np.minimum(rows[:-1], rows[1:])), 0, height).astype(np.int64)
+        high = np.clip(np.ceil(np.maximum(rows[:-1], rows[1:])), 0, height).astype(np.int64)
+        counts = np.maximum(high - low, 1) * (low < height)
+        starts = np.cumsum(counts) - counts
+        offsets = np.arange(counts.sum()) - np.repeat(starts, counts)
+        self.image[np.repeat(low, counts) + offsets, np.repeat(np.arange(width), counts)] = color
+
+
+def rasterize_cartpole(env: gym.Env, obs: np.ndarray, height: int, width: int) -> np.ndarray:
+    env = env.unwrapped
+    screen_width, screen_height = env.screen_width, env.screen_height
+    canvas = _Canvas(height, width, screen_height, screen_width)
+    scale = screen_width / (env.x_threshold * 2)
+    polewidth, polelen = 10.0, scale * (2 * env.length)
+    cartx, carty, axley = obs[0] * scale + screen_width / 2.0, 100.0, 100.0 + 30.0 / 4.0
+
+    canvas.rect(0, carty, screen_width, carty + 1, (0, 0, 0))
+    canvas.rect(cartx - 25.0, carty - 15.0, cartx + 25.0, carty + 15.0, (0, 0, 0))
+    tip_len = polelen - polewidth / 2
+    tip = (cartx + tip_len * np.sin(obs[2]), axley + tip_len * np.cos(obs[2]))
+    canvas.segment((cartx, axley), tip, polewidth / 2, (202, 152, 101))
+    canvas.disc((cartx, axley), polewidth / 2, (129, 132, 203))
+    return canvas.image
+
+
+def rasterize_pendulum(env: gym.Env, obs: np.ndarray, height: int, width: int) -> np.ndarray:
+    screen_dim = env.unwrapped.screen_dim
+    canvas = _Canvas(height, width, screen_dim, screen_dim)
+    scale = screen_dim / (2.2 * 2)
+    offset = screen_dim / 2
+    angle = np.arctan2(obs[1], obs[0]) + np.pi / 2
+    rod_end = (offset + scale * np.cos(angle), offset + scale * np.sin(angle))
+    canvas.segment((offset, offset), rod_end, 0.1 * scale, (204, 77, 77))
+    canvas.disc((offset, offset), 0.05 * scale, (0, 0, 0))
+    return canvas.image
+
+
+def rasterize_mountain_car(env: gym.Env, obs: np.ndarray, height: int, width: int) -> np.ndarray:
+    env = env.unwrapped
+    screen_width, screen_height = env.screen_width, env.screen_height
+    canvas = _Canvas(height, width, screen_height, screen_width)
+    scale = screen_width / (env.max_position - env.min_position)
+    track = lambda x: env._height(x / scale + env.min_position) * scale
+
+    canvas.curve(track, (0, 0, 0))
+    flagx = (env.goal_position - env.min_position) * scale
+    flagy = env._height(env.goal_position) * scale
+    canvas.segment((flagx, flagy), (flagx, flagy + 50), 0.5, (0, 0, 0))
+    canvas.segment((flagx, flagy + 45), (flagx + 20, flagy + 45), 3.0, (204, 204, 0))
+
+    pos = obs[0]
+    angle = np.cos(3 * pos)
+    along, up = np.array([np.cos(angle), np.sin(angle)]), np.array([-np.sin(angle), np.cos(angle)])
+    base = np.array([(pos - env.min_position) * scale, 10 + env._height(pos) * scale])
+    center = base + 10 * up
+    canvas.segment(tuple(center - 10 * along), tuple(center + 10 * along), 10.0, (0, 0, 0))
+    for wheel in (base + 10 * along, base - 10 * along):
+        canvas.disc(tuple(wheel), 20 / 2.5, (128, 128, 128))
+    return canvas.image
+
+
+# Keyed by the prefixes of `config.RASTER_ENVS`.
+RASTERIZERS: dict[str, Rasterizer] = {
+    "CartPole": rasterize_cartpole,
+    "Pendulum": rasterize_pendulum,
+    "MountainCar": rasterize_mountain_car,
+}
+
+
+def get_rasterizer(env_id: str) -> Rasterizer:
+    """The rasterizer of a gymnasium env id; `MountainCarContinuous-v0` uses the `MountainCar` one."""
+    for name, rasterizer in RASTERIZERS.items():
+        if env_id.startswith(name):
+            return rasterizer
+    raise ValueError(f"No numpy rasterizer for {env_id}; supported envs: {', '.join(RASTERIZERS)}")
+
+
+def screen_size(env: gym.Env) -> tuple[int, int]:
+    """(height, width) of the gymnasium renderer's frames."""
+    env = env.unwrapped
+    if hasattr(env, "screen_dim"):
+        return env.screen_dim, env.screen_dim
+    return env.screen_height, env.screen_width
+
+
+class ClassicFrames:
+    """Builds the `env` image of one classic-control env as configured by `ClassicConfig`.
+
+    Call `step` after every env step and `frame` whenever an observation is built. A new frame is rendered when
+    `fresh` is set (reset, end of episode) or `render_every` steps have passed since the last one; otherwise the
+    last frame is returned again. With `render_mode="off"` there is no image and `frame` returns None.
+    """
+
+    def __init__(self, config, env: gym.Env):
+        self.env = env
+        self.render_mode = config.render_mode
+        self.render_every = config.render_every
+        self._rasterize = get_rasterizer(config.classic_env_name) if config.render_mode == "raster" else None
+        # None keeps the size of the pygame frames.
+        self.size = tuple(config.image_size) if config.image_size is not None else None
+        if self.size is None and self._rasterize is not None:
+            self.size = screen_size(env)
+        self._last: np.ndarray | None = None
+        self._steps_since_render = 0
+
+    def step(self):
+        self._steps_since_render += 1
+
+    def _render(self, obs: np.ndarray) -> np.ndarray:
+        if self._rasterize is not None:
+            return self._rasterize(self.env, obs, *self.size)
+        frame = self.env.render()
+        if self.size is not None and frame.shape[:2] != self.size:
+            height, width = self.size
+            return np.asarray(Image.fromarray(frame).resize((width, height), Image.BILINEAR))
+        return np.ascontiguousarray(frame)
+
+    def frame(self, obs: np.ndarray, fresh: bool = False) -> np.ndarray | None:
+        if self.render_mode == "off":
+            return None
+        if fresh or self._last is None or self._steps_since_render >= self.render_every:
+            self._last = self._render(obs)
+            self._steps_since_render = 0
+        return self._last
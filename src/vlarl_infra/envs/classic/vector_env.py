@@ -0,0 +1,79 @@
+"""Vector variant of `classic-v1`: several classic-control envs stepped in this process."""
+import functools
+
+import gymnasium as gym
+import numpy as np
+
+from vlarl_infra.envs.base_env import Action, Observation
+from vlarl_infra.envs.classic.config import ClassicConfig
+from vlarl_infra.envs.classic.raster import ClassicFrames
+from vlarl_infra.envs.vector_env import EpisodeStatistics, final_observation
+
+
+def env_action(space: gym.Space, action: Action):
+    """The action of one env from a policy action: an index for discrete envs, an array otherwise (Pendulum)."""
+    if isinstance(space, gym.spaces.Discrete):
+        return int(np.asarray(action).item())
+    return np.asarray(action, dtype=space.dtype).reshape(space.shape)
+
+
+class ClassicVectorEnv:
+    """Steps `config.num_envs` classic-control envs with `gym.vector.SyncVectorEnv`, with the interface of
+    `SubprocVectorEnv`.
+
+    These envs step in microseconds, so a subprocess per env would cost more than the envs themselves. Finished envs
+    are reset in the same step; their final observation, image included, is kept in `infos[i]["final_obs"]`. Frames
+    are drawn from the observations, so only `render_mode="raster"` or `"off"` are supported.
+    """
+    num_envs: int
+
+    def __init__(self, config: ClassicConfig, max_episode_steps: int | None = None):
+        self.env = gym.vector.SyncVectorEnv(
+            [functools.partial(gym.make, config.classic_env_name, max_episode_steps=max_episode_steps)] * config.num_envs,
+            autoreset_mode=gym.vector.AutoresetMode.SAME_STEP,
+        )
+        self.num_envs = config.num_envs
+        self.game_name = config.classic_env_name
+        self.frames = [ClassicFrames(config, env) for env in self.env.envs]
+        self.stats = EpisodeStatistics(self.num_envs)
+
+    def _observation(self, obs: np.ndarray, fresh: np.ndarray | None = None) -> Observation:
+        frames = [f.frame(row, fresh=fresh is None or bool(fresh[i])) for i, (f, row) in enumerate(zip(self.frames, obs))]
+        images = {"env": np.stack(frames)} if frames[0] is not None else {}
+        return Observation(images=images, states={"obs": obs}, text=self.game_name)
+
+    def reset(self, *, seed: int | None = None) -> tuple[Observation, list[dict]]:
+        obs, _ = self.env.reset(seed=seed)
+        self.stats.reset()
+        return self._observation(obs), [{} for _ in range(self.num_envs)]
+
+    def step(self, actions: Action) -> tuple[Observation, np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        assert len(actions) == self.num_envs, f"Expected {self.num_envs} actions, got {len(actions)}"
+        space = self.env.single_action_space
+        obs, rewards, terminated, truncated, info = self.env.step(np.stack([env_action(space, a) for a in actions]))
+        for frames in self.frames:
+            frames.step()
+        dones = terminated | truncated
+        infos: list[dict] = [{} for _ in range(self.num_envs)]
+        for i, episode in self.stats.update(rewards, dones).items():
+            final_obs = info["final_obs"][i]
+            frame = self.frames[i].frame(final_obs, fresh=True)
+            infos[i]["final_obs"] = Observation(
+                images={"env": frame[None, ...]} if frame is not None else {},
+                states={"obs": final_obs[None, ...]},
+                text=self.game_name,
+            )
+            infos[i]["episode"] = episode
+        return (
+            self._observation(obs, fresh=dones),
+            rewards.astype(np.float32),
+            terminated.astype(bool),
+            truncated.astype(bool),
+            infos,
+        )
+
+    def final_observation(self, obs: Observation, infos: list[dict]) -> Observation:
+        return final_observation(obs, infos)
+
+    def close(self):
+        self.env.close()
@@ -1,11 +1,47 @@
+import math
+import time
 import numpy as np
 import dataclasses
+from typing import Literal
 
 from .base_env import BaseEnv, Observation, Action, BaseEnvConfig
 from vlarl_infra.utils.registration import register_env, register_env_config
 
 UID = "Dummy-v1"
 
+@dataclasses.dataclass(frozen=True)
+class DummyPreset:
+    # Camera name -> (height, width, channels).
+    cameras: dict[str, tuple[int, int, int]]
+    # State name -> dim.
+    states: dict[str, int]
+    action_dim: int
+    text: str
+
+_ROBOT0_STATES = {"robot0_eef_pos": 3, "robot0_eef_quat": 4, "robot0_gripper_qpos": 2}
+
+# Payloads of the real envs with their default configs.
+DUMMY_PRESETS: dict[str, DummyPreset] = {
+    "can-img": DummyPreset(
+        cameras={"robot0_eye_in_hand": (96, 96, 3), "agentview": (720, 1280, 3)},
+        states={**_ROBOT0_STATES, "object": 14},
+        action_dim=7,
+        text="PickPlaceCan",
+    ),
+    "transport-img": DummyPreset(
+        cameras={"robot0_eye_in_hand": (96, 96, 3), "robot1_eye_in_hand": (96, 96, 3), "agentview": (720, 1280, 3)},
+        states={**_ROBOT0_STATES, "object": 41},
+        action_dim=14,
+        text="TwoArmTransport",
+    ),
+    "breakout": DummyPreset(
+        cameras={str(i): (84, 84, 1) for i in range(4)},
+        states={},
+        action_dim=1,
+        text="BreakoutNoFrameskip-v4",
+    ),
+}
+
 @register_env_config(UID)
 @dataclasses.dataclass
 class DummyEnvConfig(BaseEnvConfig):
@@ -15,6 +51,48 @@ class DummyEnvConfig(BaseEnvConfig):
     state_dim: int = 10
     text: str = "do something"
     terminated_prob: float = 0.01
+    # How observations are generated:
+    # `random`: fresh np.random data every step (the original behaviour, slowest);
+    # `generator`: fresh data drawn as uint8 directly from a seeded np.random.Generator;
+    # `pool`: `pool_size` observations generated once and returned round-robin;
+    # `static`: the same observation every step.
+    # `pool` and `static` return shared buffers that must not be modified.
+    obs_mode: Literal["random", "generator", "pool", "static"] = "random"
+    pool_size: int = 16
+    seed: int | None = None
+
+    # Payload of a real env; replaces `cameras`, `states`, `action_dim` and `text`.
+    preset: Literal["can-img", "transport-img", "breakout"] | None = None
+    # Camera name -> (height, width, channels). Defaults to `base` at img_height x img_width and `wrist` at half size.
+    cameras: dict[str, tuple[int, int, int]] = dataclasses.field(default_factory=dict)
+    # State name -> dim. Defaults to `robot_state` of state_dim and `joint_angles` of state_dim // 2.
+    states: dict[str, int] = dataclasses.field(default_factory=dict)
+
+    # Simulated step time, including the time spent generating the observation. With `step_latency_p99_ms` set,
+    # step times are drawn from a log-normal distribution with the given mean and 99th percentile.
+    step_latency_ms: float = 0.0
+    step_latency_p99_ms: float | None = None
+    reset_latency_ms: float = 0.0
+
+    def __post_init__(self):
+        # Checked here so that tyro reports a bad latency profile as a usage error (exit code 2).
+        if self.step_latency_ms < 0 or self.reset_latency_ms < 0:
+            raise ValueError("step_latency_ms and reset_latency_ms must not be negative")
+        if self.step_latency_p99_ms is not None:
+            if self.step_latency_ms <= 0:
+                raise ValueError("step_latency_p99_ms needs a positive step_latency_ms (the mean)")
+            _lognormal_params(self.step_latency_ms / 1e3, self.step_latency_p99_ms / 1e3)
+
+_Z99 = 2.3263478740408408
+
+def _lognormal_params(mean: float, p99: float) -> tuple[float, float]:
+    """Returns (mu, sigma) of the log-normal distribution with the given mean and 99th percentile."""
+    # ln(p99) - ln(mean) = z * sigma - sigma^2 / 2, solved for the smaller sigma.
+    discriminant = _Z99 ** 2 - 2 * math.log(p99 / mean) if 0 < mean <= p99 else -1.0
+    if discriminant < 0:
+        raise ValueError(f"No log-normal distribution has mean {mean} and p99 {p99}; p99 must be within [mean, {math.exp(_Z99 ** 2 / 2):.1f} * mean]")
+    sigma = _Z99 - math.sqrt(discriminant)
+    return math.log(mean) - sigma ** 2 / 2, sigma
 
 @register_env(UID, max_episode_steps=200000)
 class DummyEnv(BaseEnv):
@@ -24,7 +102,9 @@ class DummyEnv(BaseEnv):
     state_dim: int
     text: str
     terminated_prob: float = 0.01
-    
+    cameras: dict[str, tuple[int, int, int]]
+    states: dict[str, int]
+
     def __init__(self, config: DummyEnvConfig):
         super().__init__(config=config)
         self.img_width = config.img_width
@@ -33,28 +113,77 @@ class DummyEnv(BaseEnv):
         self.state_dim = config.state_dim
         self.text = config.text
         self.terminated_prob = config.terminated_prob
+        self.cameras = config.cameras or {
+            "base": (self.img_height, self.img_width, 3),
+            "wrist": (self.img_height // 2, self.img_width // 2, 3),
+        }
+        self.states = config.states or {"robot_state": self.state_dim, "joint_angles": self.state_dim // 2}
+        if config.preset is not None:
+            preset = DUMMY_PRESETS[config.preset]
+            self.cameras, self.states = preset.cameras, preset.states
+            self.action_dim, self.text = preset.action_dim, preset.text
+
+        self.step_latency = config.step_latency_ms / 1e3
+        self.reset_latency = config.reset_latency_ms / 1e3
+        self._latency_params = None
+        if config.step_latency_p99_ms is not None:
+            self._latency_params = _lognormal_params(config.step_latency_ms / 1e3, config.step_latency_p99_ms / 1e3)
+
+        self.obs_mode = config.obs_mode
+        self._rng = np.random.default_rng(config.seed)
+        self._pool: list[Observation] = []
+        if self.obs_mode in ("pool", "static"):
+            self._pool = [self._generate_obs() for _ in range(config.pool_size if self.obs_mode == "pool" else 1)]
+        self._pool_index = 0
+
+    def _sleep_until(self, start: float, duration: float):
+        remaining = duration - (time.perf_counter() - start)
+        if remaining > 0:
+            time.sleep(remaining)
 
     def reset(self, *, seed: int | None = None, options: dict | None = None) -> tuple:
-        return self.fake_obs(), {}
+        start = time.perf_counter()
+        obs = self.next_obs()
+        self._sleep_until(start, self.reset_latency)
+        return obs, {}
 
     def step(self, action: Action) -> tuple:
+        start = time.perf_counter()
         reward = np.random.rand()
         terminated = np.random.rand() < self.terminated_prob
-        return self.fake_obs(), reward, terminated, False, {}
+        obs = self.next_obs() if self._take_render_hint(terminated) else None
+        if self._latency_params is not None:
+            self._sleep_until(start, self._rng.lognormal(*self._latency_params))
+        else:
+            self._sleep_until(start, self.step_latency)
+        return obs, reward, terminated, False, {}
+
+    def next_obs(self) -> Observation:
+        if self.obs_mode == "random":
+            return self.fake_obs()
+        if self.obs_mode == "generator":
+            return self._generate_obs()
+        obs = self._pool[self._pool_index]
+        self._pool_index = (self._pool_index + 1) % len(self._pool)
+        return obs
+
+    def _generate_obs(self) -> Observation:
+        # The full [0, 256) range lets the generator use raw random bytes instead of rejection sampling.
+        return Observation(
+            images={k: self._rng.integers(0, 256, (1, *shape), dtype=np.uint8) for k, shape in self.cameras.items()},
+            states={k: self._rng.random((1, dim)) for k, dim in self.states.items()},
+            text=self.text,
+        )
 
     def fake_action(self) -> Action:
         return np.random.rand(1, self.action_dim).astype(np.float32)
-    
+
     def fake_obs(self) -> Observation:
         obs = Observation(
             images={
-                "base": np.random.randint(0, 255, (1, self.img_height, self.img_width, 3)).astype(np.uint8),
-                "wrist": np.random.randint(0, 255, (1, self.img_height // 2, self.img_width // 2, 3)).astype(np.uint8),
-            },
-            states={
-                "robot_state": np.random.rand(1, self.state_dim),
-                "joint_angles": np.random.rand(1, self.state_dim // 2)
+                k: np.random.randint(0, 255, (1, *shape)).astype(np.uint8) for k, shape in self.cameras.items()
             },
+            states={k: np.random.rand(1, dim) for k, dim in self.states.items()},
             text=self.text,
         )
-        return obs
\ No newline at end of file
+        return obs
@@ -0,0 +1,18 @@
+import dataclasses
+
+from vlarl_infra.envs.base_env import BaseEnvConfig
+from vlarl_infra.utils.registration import register_env_config
+
+UID = "Replay-v1"
+
+@register_env_config(UID)
+@dataclasses.dataclass
+class ReplayConfig(BaseEnvConfig):
+    # Directory written by `--record-dir`.
+    rollout_dir: str = "rollouts"
+    # Replay the episodes in random order on every pass instead of the recorded order.
+    shuffle: bool = False
+    seed: int = 0
+    # Steps read from disk per prefetched block, and how many blocks the reader keeps ahead of `step`.
+    prefetch_block_size: int = 32
+    prefetch_blocks: int = 4
@@ -0,0 +1,155 @@
+import dataclasses
+import queue
+import threading
+
+import numpy as np
+
+from vlarl_infra.envs.base_env import BaseEnv, Action, Observation
+from vlarl_infra.envs.replay.config import UID, ReplayConfig
+from vlarl_infra.utils.registration import register_env
+from vlarl_infra.utils.rollout_storage import RolloutReader
+
+_TRANSITION_COLUMNS = ("action", "reward", "terminated", "truncated")
+
+
+@dataclasses.dataclass
+class _EpisodeStart:
+    seq: int
+    path: str
+    num_steps: int
+    obs: Observation
+
+
+@dataclasses.dataclass
+class _StepBlock:
+    # Steps `start:start + len(reward)` of episode `seq`; `columns` holds the transition columns and the observation
+    # reached after each of these steps.
+    seq: int
+    start: int
+    columns: dict[str, np.ndarray]
+
+
+class _Prefetcher:
+    """Reads episodes block by block in a background thread, in the order they will be replayed."""
+
+    def __init__(self, reader: RolloutReader, config: ReplayConfig):
+        self.reader = reader
+        self.config = config
+        self.queue: queue.Queue = queue.Queue(maxsize=config.prefetch_blocks)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="replay-prefetch")
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _episode_order(self):
+        rng = np.random.default_rng(self.config.seed)
+        while True:
+            order = rng.permutation(len(self.reader)) if self.config.shuffle else range(len(self.reader))
+            yield from order
+
+    def _run(self):
+        try:
+            self._read()
+        except BaseException as e:
+            # A bad shard must fail `reset`/`step` instead of leaving them waiting for blocks that never come.
+            self._put(e)
+
+    def _read(self):
+        block_size = self.config.prefetch_block_size
+        for seq, index in enumerate(self._episode_order()):
+            episode = self.reader.episode(index)
+            obs_columns = [name for name in episode.columns if name not in _TRANSITION_COLUMNS]
+            reset_obs = _observation({name: episode.rows(name, 0, 1) for name in obs_columns}, 0, episode.text)
+            if not self._put(_EpisodeStart(seq, str(episode.path), episode.num_steps, reset_obs)):
+                return
+            for start in range(0, episode.num_steps, block_size):
+                stop = min(start + block_size, episode.num_steps)
+                columns = {name: episode.rows(name, start, stop) for name in _TRANSITION_COLUMNS}
+                columns.update({name: episode.rows(name, start + 1, stop + 1) for name in obs_columns})
+                if not self._put(_StepBlock(seq, start, columns)):
+                    return
+
+    def get(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=1.0)
+                break
+            except queue.Empty:
+                # The thread may have put its last item right before exiting.
+                if not self._thread.is_alive() and self.queue.empty():
+                    raise RuntimeError("The replay prefetch thread stopped")
+        if isinstance(item, BaseException):
+            raise RuntimeError("Reading the recorded episodes failed") from item
+        return item
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join(timeout=2.0)
+
+
+def _observation(columns: dict[str, np.ndarray], i: int, text: str) -> Observation:
+    images, states = {}, {}
+    for name, rows in columns.items():
+        if name.startswith("obs.images."):
+            images[name[len("obs.images."):]] = rows[i]
+        elif name.startswith("obs.states."):
+            states[name[len("obs.states."):]] = rows[i]
+    return Observation(images=images, states=states, text=text)
+
+
+@register_env(UID)
+class ReplayEnv(BaseEnv):
+    """Replays episodes recorded with `RecordRolloutWrapper`, ignoring the actions it is given.
+
+    Every episode is served as recorded: same observations, rewards and done flags. Episodes are read ahead by a
+    background thread, so `step` only indexes into memory that is already loaded. The recorded episodes are
+    replayed in a loop.
+    """
+    def __init__(self, config: ReplayConfig):
+        super().__init__(config=config)
+        self.reader = RolloutReader(config.rollout_dir)
+        if len(self.reader) == 0:
+            raise ValueError(f"No recorded episodes found in {config.rollout_dir}")
+        self._prefetcher = _Prefetcher(self.reader, config)
+        self._seq = -1
+        self._episode: _EpisodeStart | None = None
+        self._block: _StepBlock | None = None
+        self._step = 0
+
+    def reset(self, *, seed: int | None = None, options: dict | None = None) -> tuple[Observation | None, dict]:
+        # Blocks left over from an episode that was cut short (e.g. by a TimeLimit) are skipped.
+        item = self._prefetcher.get()
+        while not isinstance(item, _EpisodeStart):
+            item = self._prefetcher.get()
+        self._seq, self._episode, self._block, self._step = item.seq, item, None, 0
+        return item.obs, {"replay_episode": item.path}
+
+    def step(self, action: Action) -> tuple[Observation | None, float, bool, bool, dict]:
+        assert self._episode is not None, "reset must be called first"
+        if self._step >= self._episode.num_steps:
+            raise RuntimeError("The replayed episode is over, call reset first")
+        if self._block is None or self._step >= self._block.start + len(self._block.columns["reward"]):
+            self._block = self._prefetcher.get()
+            assert isinstance(self._block, _StepBlock) and self._block.seq == self._seq
+        i = self._step - self._block.start
+        columns = self._block.columns
+        obs = _observation(columns, i, self._episode.obs.text)
+        self._step += 1
+        terminated = bool(columns["terminated"][i])
+        # Episodes cut short while recording end with neither flag set.
+        truncated = bool(columns["truncated"][i]) or (self._step == self._episode.num_steps and not terminated)
+        return obs, float(columns["reward"][i]), terminated, truncated, {}
+
+    def fake_action(self) -> Action:
+        return np.zeros_like(self.reader.episode(0).row("action", 0))
+
+    def close(self):
+        self._prefetcher.stop()
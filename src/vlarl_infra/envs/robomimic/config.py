@@ -0,0 +1,26 @@
+import dataclasses
+import pathlib
+
+from vlarl_infra.envs.base_env import BaseEnvConfig
+from vlarl_infra.utils.registration import register_env_config
+
+UID = "Robomimic-v1"
+ENV_META_DIR = pathlib.Path(__file__).parent / "env_meta"
+
+@register_env_config(UID)
+@dataclasses.dataclass
+class RobomimicConfig(BaseEnvConfig):
+    name: str = "can-img"
+    low_dim_keys: list[str] = dataclasses.field(default_factory=lambda: [
+        'robot0_eef_pos',
+        'robot0_eef_quat',
+        'robot0_gripper_qpos',
+        'object'
+    ])
+    agentview_image_size: tuple[int, int] = (720, 1280)
+    # Render the agentview camera and build the observation only on steps whose observation is used (see
+    # `BaseEnv.request_render`); other steps return None. The robosuite cameras are still rendered every step.
+    lazy_render: bool = True
+    # Render the policy's agentview at this (height, width) instead. The `agentview_image_size` image is then only
+    # rendered when a capture is requested, e.g. by the remote viewer, and returned in `info["capture"]`.
+    policy_image_size: tuple[int, int] | None = None
@@ -1,7 +1,8 @@
 import os
 os.environ["MUJOCO_GL"] = "egl"
+import copy
+import functools
 import json
-import pathlib
 import numpy as np
 
 try:
@@ -13,59 +14,58 @@ except:
     raise ImportError(
         "Robomimic is not installed. Please install it with the 'robomimic' extra, e.g. 'pip install vlarl_infra[robomimic]'"
     )
-from vlarl_infra.envs.base_env import BaseEnv, BaseEnvConfig, Action, Observation
-import dataclasses
-from vlarl_infra.utils.registration import register_env, register_env_config
+from vlarl_infra.envs.base_env import BaseEnv, Action, Observation
+from vlarl_infra.envs.robomimic.config import UID, ENV_META_DIR, RobomimicConfig
+from vlarl_infra.utils.registration import register_env
 
-UID = "Robomimic-v1"
-ENV_META_DIR = pathlib.Path(__file__).parent / "env_meta"
+@functools.lru_cache(maxsize=None)
+def _load_env_meta(name: str) -> dict:
+    try:
+        with open(ENV_META_DIR / f"{name}.json", 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"Environment metadata file not found for env name: {name}")
+
+def load_env_meta(name: str) -> dict:
+    """Parsed `env_meta/<name>.json`, read once per process. Returns a copy the caller may modify."""
+    return copy.deepcopy(_load_env_meta(name))
+
+def _create_sim(env_meta: dict) -> "robomimic.envs.env_robosuite.EnvRobosuite":
+    env = _env_utils.create_env_from_metadata(
+        env_meta=env_meta,
+        render=False,
+        render_offscreen=True,
+        use_image_obs=True,
+    )
+    assert isinstance(env, robomimic.envs.env_robosuite.EnvRobosuite)
+    return env
 
-@register_env_config(UID)
-@dataclasses.dataclass
-class RobomimicConfig(BaseEnvConfig):
-    name: str = "can-img"
-    low_dim_keys: list[str] = dataclasses.field(default_factory=lambda: [
-        'robot0_eef_pos',
-        'robot0_eef_quat',
-        'robot0_gripper_qpos',
-        'object'
-    ])
-    agentview_image_size: tuple[int, int] = (720, 1280)
-    
 @register_env(UID, best_reward_threshold_for_success=1.)
 class RobomimicEnv(BaseEnv):
     env: robomimic.envs.env_robosuite.EnvRobosuite
     image_keys: list[str]
     task: str
     agentview_image_size: tuple[int, int]
+    policy_image_size: tuple[int, int] | None
     
     def __init__(self, config: RobomimicConfig):
         super().__init__(config=config)
         
-        try:
-            env_meta_json_path = ENV_META_DIR / f"{config.name}.json"
-            env_meta = json.load(open(env_meta_json_path, 'r'))
-        except FileNotFoundError:
-            raise ValueError(f"Environment metadata file not found for env name: {config.name}")
+        env_meta = load_env_meta(config.name)
         
         _obs_utils.initialize_obs_modality_mapping_from_dict(dict(
             low_dim=config.low_dim_keys,
         ))
         
-        env = _env_utils.create_env_from_metadata(
-            env_meta=env_meta,
-            render=False,
-            render_offscreen=True,
-            use_image_obs=True,
-        )
-        assert isinstance(env, robomimic.envs.env_robosuite.EnvRobosuite)
-        self.env = env
+        self.env = _create_sim(env_meta)
         
         self.env.env.hard_reset = False
         
         self.image_keys = env_meta['env_kwargs']['camera_names']
         self.task = env_meta['env_name']
         self.agentview_image_size = config.agentview_image_size
+        self.policy_image_size = config.policy_image_size
+        self.lazy_render = config.lazy_render
     
     def prepare_obs(self, obs, agentview_image) -> Observation:
         images = {}
@@ -80,22 +80,37 @@ class RobomimicEnv(BaseEnv):
             text=text,
         )
         
+    def _observe(self, obs: dict, info: dict, done: bool = False) -> Observation | None:
+        """Renders the agentview and builds the observation, unless the render hints say it is not needed. A
+        requested full-resolution capture goes to `info`."""
+        if self.capture_requested and self.policy_image_size is not None:
+            info["capture"] = {"agentview": self.render()[None]}
+        if not self._take_render_hint(done) and self.lazy_render:
+            return None
+        return self.prepare_obs(obs, self.render(self.policy_image_size))
+        
     def reset(self, *, seed: int | None = None, options: dict | None = None) -> tuple:
         obs = self.env.reset()
-        agentview_image = self.render()
-        return self.prepare_obs(obs, agentview_image), {}
+        info = {}
+        return self._observe(obs, info, done=True), info
     
     def step(self, action: Action) -> tuple:
         assert action.shape[0] == 1, "Batch size must be 1 for robomimic env"
         action = action[0].tolist()
         obs, reward, done, info = self.env.step(action)
-        agentview_image = self.render()
-        return self.prepare_obs(obs, agentview_image), reward, done, False, info
+        return self._observe(obs, info, done), reward, done, False, info
     
-    def render(self) -> np.ndarray:
+    def render(self, size: tuple[int, int] | None = None) -> np.ndarray:
+        """Renders the agentview camera at `size`, by default at the full `agentview_image_size`."""
+        height, width = size or self.agentview_image_size
         return self.env.render(
             mode="rgb_array",
-            height=self.agentview_image_size[0],
-            width=self.agentview_image_size[1],
+            height=height,
+            width=width,
             camera_name="agentview",
-        )
\ No newline at end of file
+        )
+
+    def close(self):
+        if self.env is not None:
+            self.env.env.close()
+            self.env = None
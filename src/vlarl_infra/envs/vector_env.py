@@ -0,0 +1,126 @@
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+from typing import Callable, Sequence
+
+import numpy as np
+import gymnasium as gym
+
+from vlarl_infra.envs.base_env import (
+    Observation, Action, concatenate_observations, copy_observation, reuses_obs_buffers, split_observation
+)
+
+
+def _worker(remote: Connection, parent_remote: Connection, env_fn: Callable[[], gym.Env]):
+    parent_remote.close()
+    env = env_fn()
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                obs, reward, terminated, truncated, info = env.step(data)
+                if terminated or truncated:
+                    # Auto-reset so the next batched infer always sees a live episode for every env.
+                    info["final_obs"] = copy_observation(obs) if reuses_obs_buffers(env) else obs
+                    obs, info["reset_info"] = env.reset()
+                remote.send((obs, float(reward), bool(terminated), bool(truncated), info))
+            elif cmd == "reset":
+                remote.send(env.reset(seed=data))
+            elif cmd == "close":
+                break
+            else:
+                raise NotImplementedError(f"Unknown command: {cmd}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        env.close()
+        remote.close()
+
+
+def final_observation(obs: Observation, infos: list[dict]) -> Observation:
+    """Returns `obs` with the rows of finished envs replaced by their final (pre-reset) observation."""
+    rows = split_observation(obs)
+    return concatenate_observations([info.get("final_obs", row) for row, info in zip(rows, infos)])
+
+
+class EpisodeStatistics:
+    """Return and length of the running episode of every env in a batch, for native vector envs, which are not
+    wrapped in `RecordEpisodeStatistics`."""
+
+    def __init__(self, num_envs: int):
+        self.returns = np.zeros(num_envs)
+        self.lengths = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self):
+        self.returns[:] = 0.0
+        self.lengths[:] = 0
+
+    def update(self, rewards: np.ndarray, dones: np.ndarray) -> dict[int, dict]:
+        """Adds a step and returns the `episode` info (`r`, `l`) of every env whose episode ended with it."""
+        self.returns += rewards
+        self.lengths += 1
+        episodes = {int(i): {"r": float(self.returns[i]), "l": int(self.lengths[i])} for i in np.flatnonzero(dones)}
+        self.returns[dones] = 0.0
+        self.lengths[dones] = 0
+        return episodes
+
+
+class SubprocVectorEnv:
+    """Runs several `BaseEnv` instances in subprocesses and steps them in lockstep.
+
+    Observations are returned batched along the leading `b` dimension so that a single infer request covers all
+    envs. Finished envs are reset automatically; their final observation is kept in `infos[i]["final_obs"]`.
+    """
+    num_envs: int
+
+    def __init__(self, env_fns: Sequence[Callable[[], gym.Env]], context: str | None = None):
+        self.num_envs = len(env_fns)
+        if context is None:
+            context = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(context)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(self.num_envs)])
+        self.processes = []
+        for work_remote, remote, env_fn in zip(self.work_remotes, self.remotes, env_fns):
+            process = ctx.Process(target=_worker, args=(work_remote, remote, env_fn), daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+        self.closed = False
+
+    def reset(self, *, seed: int | None = None) -> tuple[Observation, list[dict]]:
+        for i, remote in enumerate(self.remotes):
+            remote.send(("reset", None if seed is None else seed + i))
+        results = [remote.recv() for remote in self.remotes]
+        obs, infos = zip(*results)
+        return concatenate_observations(obs), list(infos)
+
+    def step(self, actions: Action) -> tuple[Observation, np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        assert len(actions) == self.num_envs, f"Expected {self.num_envs} actions, got {len(actions)}"
+        for i, remote in enumerate(self.remotes):
+            remote.send(("step", actions[i:i+1]))
+        results = [remote.recv() for remote in self.remotes]
+        obs, rewards, terminated, truncated, infos = zip(*results)
+        return (
+            concatenate_observations(obs),
+            np.array(rewards, dtype=np.float32),
+            np.array(terminated, dtype=bool),
+            np.array(truncated, dtype=bool),
+            list(infos),
+        )
+
+    def final_observation(self, obs: Observation, infos: list[dict]) -> Observation:
+        return final_observation(obs, infos)
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            try:
+                remote.send(("close", None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self.closed = True
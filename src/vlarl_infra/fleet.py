@@ -0,0 +1,229 @@
+"""`vlarl-run-fleet`: runs and supervises several worker processes with the same env config.
+
+Every worker is a `vlarl-run-worker` process (`cli._main`) started with the fleet's `Args`. Crashed workers are
+restarted with exponential backoff, unless they rejected their configuration (exit code 2). Workers can be pinned
+to CPU cores, and their per-episode step counts are collected over a queue and logged as fleet totals.
+"""
+import dataclasses
+import multiprocessing as mp
+import os
+import queue
+import signal
+import sys
+import time
+
+import tyro
+from loguru import logger
+
+from vlarl_infra.cli import EXIT_INVALID_CONFIG, Args, _CONFIGS_DICT, _main
+from vlarl_infra.utils.affinity import available_cpus, format_cpu_list, parse_cpu_list
+from vlarl_infra.utils.profiling import ProfileSink, StepProfiler
+
+
+@dataclasses.dataclass
+class FleetArgs(Args):
+    num_workers: int = 1
+    # Pin every worker to `cpus_per_worker` cores, assigned in turn from the cores this process may run on (or
+    # from --cpus). Unless --num-threads is given, workers are then capped at `cpus_per_worker` threads.
+    pin_cpus: bool = False
+    cpus_per_worker: int = 1
+    # Seconds before restarting a crashed worker, doubled after each consecutive crash up to `max_restart_backoff`.
+    restart_backoff: float = 1.0
+    max_restart_backoff: float = 60.0
+    # A worker that ran this many seconds before crashing counts as healthy again: the backoff starts over.
+    healthy_after: float = 60.0
+    # Give up on a worker after this many restarts.
+    max_restarts: int | None = None
+    # Seconds between fleet metric reports.
+    metrics_interval: float = 10.0
+    # Write each worker's output to `worker_<rank>.log` in this directory instead of the fleet's stdout.
+    worker_log_dir: str | None = None
+
+
+def cli() -> FleetArgs:
+    return tyro.extras.overridable_config_cli(
+        {k: (k, FleetArgs(uid=v.uid, env=v.env)) for k, v in _CONFIGS_DICT.items()}
+    )
+
+
+class QueueSink(ProfileSink):
+    """Sends the step count and duration of every episode to the supervisor."""
+
+    def __init__(self, metrics: mp.Queue, rank: int):
+        self.metrics = metrics
+        self.rank = rank
+
+    def write(self, profiler: StepProfiler, summary: dict):
+        self.metrics.put((self.rank, summary["steps"], summary["seconds"]))
+
+
+def _cpu_sets(args: FleetArgs) -> list[str | None]:
+    """The --cpus of every worker."""
+    if not args.pin_cpus:
+        return [args.cpus] * args.num_workers
+    cpus = parse_cpu_list(args.cpus) if args.cpus is not None else available_cpus()
+    k = args.cpus_per_worker
+    if args.num_workers * k > len(cpus):
+        logger.warning(f"{args.num_workers} workers x {k} cores oversubscribe the {len(cpus)} available cores")
+    return [format_cpu_list({cpus[(rank * k + i) % len(cpus)] for i in range(k)}) for rank in range(args.num_workers)]
+
+
+def _worker_args(args: FleetArgs, rank: int, cpus: str | None) -> Args:
+    """The `Args` of one worker: its cores, per-worker output paths, and only worker 0 talks to the remote viewer."""
+    worker_args = Args(**{f.name: getattr(args, f.name) for f in dataclasses.fields(Args)})
+    return dataclasses.replace(
+        worker_args,
+        cpus=cpus,
+        num_threads=args.cpus_per_worker if args.pin_cpus and args.num_threads is None else args.num_threads,
+        use_remote_viewer=args.use_remote_viewer and rank == 0,
+        record_dir=os.path.join(args.record_dir, f"worker_{rank}") if args.record_dir else None,
+        profile_sink=f"{args.profile_sink}.{rank}" if args.profile_sink else None,
+    )
+
+
+def _run_worker(args: Args, rank: int, metrics: mp.Queue, log_dir: str | None):
+    if log_dir is not None:
+        log_file = open(os.path.join(log_dir, f"worker_{rank}.log"), "a", buffering=1)
+        os.dup2(log_file.fileno(), sys.stdout.fileno())
+        os.dup2(log_file.fileno(), sys.stderr.fileno())
+    sys.exit(_main(args, sinks=[QueueSink(metrics, rank)]))
+
+
+@dataclasses.dataclass
+class _Worker:
+    rank: int
+    args: Args
+    process: mp.Process | None = None
+    started_at: float = 0.0
+    restarts: int = 0
+    consecutive_crashes: int = 0
+    # Time of the next (re)start, None once the worker is finished or given up on.
+    start_at: float | None = 0.0
+    exit_code: int | None = None
+    steps: int = 0
+    episodes: int = 0
+
+
+class Fleet:
+    def __init__(self, args: FleetArgs):
+        self.args = args
+        self._ctx = mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+        self.metrics = self._ctx.Queue()
+        self.workers = [_Worker(rank, _worker_args(args, rank, cpus)) for rank, cpus in enumerate(_cpu_sets(args))]
+        if args.worker_log_dir is not None:
+            os.makedirs(args.worker_log_dir, exist_ok=True)
+
+    def _start(self, worker: _Worker):
+        # Not daemonic: workers with --num-envs > 1 start processes of their own.
+        worker.process = self._ctx.Process(
+            target=_run_worker,
+            args=(worker.args, worker.rank, self.metrics, self.args.worker_log_dir),
+            name=f"worker-{worker.rank}",
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.start_at = None
+        cpus = f" on cores {worker.args.cpus}" if worker.args.cpus is not None else ""
+        logger.info(f"Started worker {worker.rank} (pid {worker.process.pid}){cpus}")
+
+    def _reap(self, worker: _Worker, now: float):
+        assert worker.process is not None
+        exit_code = worker.process.exitcode
+        worker.process = None
+        worker.exit_code = exit_code
+        if exit_code == 0:
+            logger.info(f"Worker {worker.rank} finished")
+            return
+        if exit_code == EXIT_INVALID_CONFIG:
+            # The same args would fail again on every restart.
+            logger.error(f"Worker {worker.rank} rejected its configuration (exit code {exit_code}); not restarting it")
+            return
+        if now - worker.started_at >= self.args.healthy_after:
+            worker.consecutive_crashes = 0
+        worker.consecutive_crashes += 1
+        if self.args.max_restarts is not None and worker.restarts >= self.args.max_restarts:
+            logger.error(f"Worker {worker.rank} exited with code {exit_code}; giving up after {worker.restarts} restarts")
+            return
+        delay = min(self.args.restart_backoff * 2 ** (worker.consecutive_crashes - 1), self.args.max_restart_backoff)
+        worker.restarts += 1
+        worker.start_at = now + delay
+        logger.warning(f"Worker {worker.rank} exited with code {exit_code}; restarting in {delay:.1f}s")
+
+    def _drain_metrics(self):
+        while True:
+            try:
+                rank, steps, _ = self.metrics.get_nowait()
+            except queue.Empty:
+                return
+            self.workers[rank].steps += steps
+            self.workers[rank].episodes += 1
+
+    def _report(self, elapsed: float, steps_since: int):
+        alive = sum(w.process is not None for w in self.workers)
+        logger.info(
+            f"Fleet: {alive}/{len(self.workers)} workers alive, {sum(w.restarts for w in self.workers)} restarts, "
+            f"{sum(w.episodes for w in self.workers)} episodes, {sum(w.steps for w in self.workers)} steps, "
+            f"{steps_since / max(elapsed, 1e-9):.1f} steps/s"
+        )
+
+    def run(self) -> int:
+        last_report, last_steps = time.monotonic(), 0
+        while True:
+            now = time.monotonic()
+            for worker in self.workers:
+                if worker.process is not None and not worker.process.is_alive():
+                    self._reap(worker, now)
+                if worker.process is None and worker.start_at is not None and worker.start_at <= now:
+                    self._start(worker)
+            self._drain_metrics()
+
+            if now - last_report >= self.args.metrics_interval:
+                steps = sum(w.steps for w in self.workers)
+                self._report(now - last_report, steps - last_steps)
+                last_report, last_steps = now, steps
+            if all(w.process is None and w.start_at is None for w in self.workers):
+                break
+            time.sleep(0.1)
+
+        self._drain_metrics()
+        logger.info(
+            f"Fleet finished: {sum(w.episodes for w in self.workers)} episodes, {sum(w.steps for w in self.workers)} steps, "
+            f"{sum(w.restarts for w in self.workers)} restarts"
+        )
+        return 0 if all(w.exit_code == 0 for w in self.workers) else 1
+
+    def stop(self, timeout: float = 10.0):
+        """Terminates the running workers, killing those that have not exited after `timeout` seconds."""
+        running = [w.process for w in self.workers if w.process is not None]
+        for process in running:
+            process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in running:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        for worker in self.workers:
+            worker.process, worker.start_at = None, None
+
+
+def _handle_sigterm(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _fleet_main(args: FleetArgs) -> int:
+    logger.configure(handlers=[{"sink": sys.stdout, "level": args.log_level.upper()}])
+    logger.info(f"Starting a fleet of {args.num_workers} {args.uid} workers")
+    fleet = Fleet(args)
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    try:
+        return fleet.run()
+    except KeyboardInterrupt:
+        logger.info("Stopping the fleet")
+        return 130
+    finally:
+        fleet.stop()
+
+
+def main():
+    sys.exit(_fleet_main(cli()))
@@ -0,0 +1,3 @@
+from .websocket_agent import ZeroCopyWorkerAgent, SharedMemoryWorkerAgent
+from .async_agent import AsyncWorkerAgent
+from .feedback import FeedbackChannel
\ No newline at end of file
@@ -0,0 +1,106 @@
+import asyncio
+import collections
+from typing import Any
+
+from loguru import logger
+from websockets.asyncio.client import connect, ClientConnection
+from vlarl_client.websocket_worker_agent import MessageType
+
+from vlarl_infra.transport import wire
+from vlarl_infra.transport.feedback import FEEDBACK_BATCH
+from vlarl_infra.transport.shm import SharedMemoryRing
+
+
+class AsyncWorkerAgent:
+    """asyncio worker agent speaking the same protocol as `ZeroCopyWorkerAgent`.
+
+    Outgoing messages go through a queue drained by a single sender task, so they reach the server in call order.
+    `infer` awaits the matching ACTION message; `feedback` only enqueues its message and returns at once, so the
+    step loop does not wait for it to be sent. Arrays passed to either call must not be modified afterwards.
+    With `num_shm_slots`, large arrays go through a `SharedMemoryRing` as with `SharedMemoryWorkerAgent`.
+    """
+    _ws: ClientConnection
+    _server_metadata: Any
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8000, num_shm_slots: int | None = None):
+        self._uri = f"ws://{host}:{port}"
+        self._ring = SharedMemoryRing(num_slots=num_shm_slots) if num_shm_slots else None
+        self._outgoing: asyncio.Queue = asyncio.Queue()
+        self._pending: collections.deque[asyncio.Future] = collections.deque()
+        self._tasks: list[asyncio.Task] = []
+        self._error: BaseException | None = None
+
+    async def connect(self) -> Any:
+        logger.info(f"Connecting to {self._uri}")
+        self._ws = await connect(self._uri, compression=None, max_size=None)
+        self._server_metadata = self._check(wire.unpackb(await self._ws.recv()), MessageType.METADATA)
+        self._tasks = [asyncio.create_task(self._send_loop()), asyncio.create_task(self._recv_loop())]
+        return self._server_metadata
+
+    def get_server_metadata(self) -> Any:
+        return self._server_metadata
+
+    @staticmethod
+    def _check(message: dict, message_type: MessageType) -> Any:
+        if message.get("message_type") != str(message_type):
+            raise RuntimeError(f"Expected a {message_type} message but received: {message.get('message_type')}")
+        return message.get("data")
+
+    def _fail(self, error: BaseException):
+        self._error = error
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    async def _send_loop(self):
+        while True:
+            message = await self._outgoing.get()
+            try:
+                # After a failure the queue is still drained, so `close` does not wait forever.
+                if self._error is None:
+                    fragments = wire.pack_fragments(message)
+                    await self._ws.send(fragments[0] if len(fragments) == 1 else fragments)
+            except Exception as e:
+                self._fail(e)
+            finally:
+                self._outgoing.task_done()
+
+    async def _recv_loop(self):
+        try:
+            async for raw in self._ws:
+                data = self._check(wire.unpackb(raw), MessageType.ACTION)
+                self._pending.popleft().set_result(data)
+            self._fail(ConnectionError("Connection closed by the server"))
+        except Exception as e:
+            self._fail(e)
+
+    def _enqueue(self, message_type: MessageType | str, data: Any):
+        if self._error is not None:
+            raise self._error
+        if self._ring is not None:
+            data = self._ring.encode(data)
+        self._outgoing.put_nowait(dict(message_type=str(message_type), data=data))
+
+    async def infer(self, obs: dict) -> dict:
+        self._enqueue(MessageType.INFER, obs)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        return await future
+
+    def feedback(self, obs: dict, reward: Any, terminated: Any, truncated: Any, info: Any):
+        self._enqueue(MessageType.FEEDBACK, dict(obs=obs, reward=reward, terminated=terminated, truncated=truncated, info=info))
+
+    def feedback_batch(self, records: list[dict]):
+        self._enqueue(FEEDBACK_BATCH, dict(records=records))
+
+    async def close(self):
+        """Waits for queued messages to be sent, then closes the connection. Also releases the shared-memory ring
+        of an agent that never connected."""
+        await self._outgoing.join()
+        for task in self._tasks:
+            task.cancel()
+        if hasattr(self, "_ws"):
+            await self._ws.close()
+        if self._ring is not None:
+            self._ring.close()
@@ -0,0 +1,237 @@
+"""Per-key compression of observations before they are sent to the policy server.
+
+Each image key gets a codec spec such as `none`, `lz4`, `zstd:3`, `png`, `jpeg:90` or `webp:80`. Encoded arrays are
+replaced by self-describing payloads, so the server only needs `decode` to restore them, whatever the worker used.
+"""
+import abc
+import dataclasses
+import io
+import time
+from typing import Any, Literal
+
+import numpy as np
+from PIL import Image
+
+from vlarl_infra.envs.base_env import Observation
+from vlarl_infra.transport.frame_stream import FrameStackEncoder, FrameStackDecoder
+from vlarl_infra.transport.wire import _array_buffer
+
+
+@dataclasses.dataclass
+class CodecConfig:
+    # Codec spec per image key, e.g. `agentview jpeg:90 robot0_eye_in_hand none`.
+    images: dict[str, str] = dataclasses.field(default_factory=dict)
+    # Codec for image keys not listed in `images`.
+    default_image_codec: str = "none"
+    # Downcast floating point states before sending them.
+    state_dtype: Literal["keep", "float32"] = "keep"
+    # Image keys of a frame stack, oldest first (`0 1 2 3` for Atari). Only frames that are new since the previous
+    # message are sent; the server rebuilds the stack with `ObservationDecoder`.
+    frame_stream_keys: list[str] = dataclasses.field(default_factory=list)
+
+
+class Codec(abc.ABC):
+    name: str
+
+    @abc.abstractmethod
+    def encode(self, array: np.ndarray) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def decode(self, data: Any, dtype: np.dtype, shape: tuple[int, ...]) -> np.ndarray:
+        ...
+
+
+class Lz4Codec(Codec):
+    name = "lz4"
+
+    def __init__(self):
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ImportError("lz4 is not installed. Please install it with pip install lz4.")
+        self._lz4 = lz4.frame
+
+    def encode(self, array: np.ndarray) -> bytes:
+        return self._lz4.compress(_array_buffer(array))
+
+    def decode(self, data: bytes, dtype: np.dtype, shape: tuple[int, ...]) -> np.ndarray:
+        return np.frombuffer(self._lz4.decompress(data), dtype=dtype).reshape(shape)
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstandard is not installed. Please install it with pip install zstandard.")
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, array: np.ndarray) -> bytes:
+        return self._compressor.compress(_array_buffer(array))
+
+    def decode(self, data: bytes, dtype: np.dtype, shape: tuple[int, ...]) -> np.ndarray:
+        return np.frombuffer(self._decompressor.decompress(data), dtype=dtype).reshape(shape)
+
+
+class ImageCodec(Codec):
+    """Encodes every frame of a `(b, h, w, c)` uint8 batch as a separate PNG/JPEG/WebP image."""
+
+    def __init__(self, name: Literal["png", "jpeg", "webp"], quality: int | None = None):
+        self.name = name
+        self.quality = quality
+
+    def encode(self, array: np.ndarray) -> list[bytes]:
+        assert array.dtype == np.uint8 and array.ndim == 4, f"Expected a (b, h, w, c) uint8 array, got {array.dtype} {array.shape}"
+        kwargs = {} if self.quality is None else {"quality": self.quality}
+        frames = []
+        for frame in array:
+            img = Image.fromarray(frame[..., 0] if frame.shape[-1] == 1 else frame)
+            buffered = io.BytesIO()
+            img.save(buffered, format=self.name.upper(), **kwargs)
+            frames.append(buffered.getvalue())
+        return frames
+
+    def decode(self, data: list[bytes], dtype: np.dtype, shape: tuple[int, ...]) -> np.ndarray:
+        frames = [np.asarray(Image.open(io.BytesIO(frame))) for frame in data]
+        return np.stack(frames).reshape(shape).astype(dtype, copy=False)
+
+
+def make_codec(spec: str) -> Codec | None:
+    """Builds a codec from a spec like `jpeg:90`; `none` returns None."""
+    name, _, arg = spec.partition(":")
+    if name == "none":
+        return None
+    if name == "lz4":
+        return Lz4Codec()
+    if name == "zstd":
+        return ZstdCodec(level=int(arg) if arg else 3)
+    if name in ("png", "jpeg", "webp"):
+        return ImageCodec(name, quality=int(arg) if arg else None)
+    raise ValueError(f"Unknown codec: {spec}")
+
+
+@dataclasses.dataclass
+class CodecStats:
+    raw_bytes: int = 0
+    encoded_bytes: int = 0
+    encode_seconds: float = 0.0
+    count: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / max(self.encoded_bytes, 1)
+
+
+def _payload_size(data: Any) -> int:
+    return sum(len(frame) for frame in data) if isinstance(data, list) else len(data)
+
+
+class ObservationEncoder:
+    """Applies the configured codec of every image key and the state downcast to an observation."""
+
+    def __init__(self, config: CodecConfig | None = None):
+        config = config or CodecConfig()
+        self.config = config
+        self._codecs = {key: make_codec(spec) for key, spec in config.images.items()}
+        self._default_codec = make_codec(config.default_image_codec)
+        self._frame_stream = FrameStackEncoder(config.frame_stream_keys) if config.frame_stream_keys else None
+        self.stats: dict[str, CodecStats] = {}
+
+    @property
+    def is_identity(self) -> bool:
+        return (
+            self._default_codec is None
+            and not any(self._codecs.values())
+            and self.config.state_dtype == "keep"
+            and self._frame_stream is None
+        )
+
+    def reset(self):
+        """Call at episode reset so the next message carries a keyframe."""
+        if self._frame_stream is not None:
+            self._frame_stream.reset()
+
+    def encode(self, obs: Observation, use_frame_stream: bool = True) -> dict:
+        """Encodes `obs` for the wire. With `use_frame_stream=False` the frame stack is sent whole and the stream
+        state is left untouched, for messages the server may decode out of order with the stream."""
+        wire = obs.to_wire()
+        if self.is_identity:
+            return wire
+        if self._frame_stream is not None and use_frame_stream:
+            raw_bytes = sum(wire["images"][key].nbytes for key in self._frame_stream.keys)
+            start = time.perf_counter()
+            wire = self._frame_stream.encode(wire)
+            stats = self.stats.setdefault("frame_stream", CodecStats())
+            stats.encode_seconds += time.perf_counter() - start
+            stats.raw_bytes += raw_bytes
+            stats.encoded_bytes += wire["frame_stream"]["frames"].nbytes
+            stats.count += 1
+        for key, array in wire["images"].items():
+            codec = self._codecs.get(key, self._default_codec)
+            if codec is None:
+                continue
+            start = time.perf_counter()
+            data = codec.encode(array)
+            stats = self.stats.setdefault(key, CodecStats())
+            stats.encode_seconds += time.perf_counter() - start
+            stats.raw_bytes += array.nbytes
+            stats.encoded_bytes += _payload_size(data)
+            stats.count += 1
+            wire["images"][key] = {
+                b"__codec__": codec.name,
+                b"data": data,
+                b"dtype": array.dtype.str,
+                b"shape": array.shape,
+            }
+        if self.config.state_dtype == "float32":
+            wire["states"] = {
+                k: v.astype(np.float32) if np.issubdtype(v.dtype, np.floating) else v for k, v in wire["states"].items()
+            }
+        return wire
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{key}: ratio {s.ratio:.1f}x, {s.encode_seconds / max(s.count, 1) * 1e3:.2f} ms/encode"
+            for key, s in self.stats.items()
+        )
+
+
+_DECODERS: dict[str, Codec] = {}
+
+
+def _decoder(name: str) -> Codec:
+    if name not in _DECODERS:
+        codec = make_codec(name)
+        assert codec is not None
+        _DECODERS[name] = codec
+    return _DECODERS[name]
+
+
+def decode(obj: Any) -> Any:
+    """Replaces every codec payload in a decoded message with the original array."""
+    if isinstance(obj, dict):
+        if b"__codec__" in obj:
+            codec = _decoder(obj[b"__codec__"])
+            return codec.decode(obj[b"data"], np.dtype(obj[b"dtype"]), tuple(obj[b"shape"]))
+        return {k: decode(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [decode(v) for v in obj]
+    return obj
+
+
+
+class ObservationDecoder:
+    """Server-side counterpart of `ObservationEncoder`. Keep one instance per connection: frame streams are stateful."""
+
+    def __init__(self):
+        self._frame_stream = FrameStackDecoder()
+
+    def decode(self, data: Any) -> Any:
+        data = decode(data)
+        if isinstance(data, dict) and "frame_stream" in data:
+            data = self._frame_stream.decode(data)
+        return data
@@ -0,0 +1,87 @@
+"""Feedback sent to the policy server after each action chunk, one message per chunk or batched.
+
+In `batched` mode, feedback records (reward, terminated, truncated, info and optionally the observation) are
+collected and sent `batch_size` at a time in a single `feedback_batch` message::
+
+    {"message_type": "feedback_batch", "data": {"records": [record, ...]}}
+
+With `obs_mode="ref"`, a record does not carry its observation when it is identical to the one sent with the next
+infer, which is the case whenever the episode goes on. It carries `obs_ref` instead: the 0-based index of that
+infer message on the connection. Records that end an episode carry their final observation in full. Batches are
+sent at the end of every episode and otherwise whenever `batch_size` records are pending, so the server must be
+ready to receive infer messages while feedback is outstanding.
+"""
+from typing import Any, Callable, Literal
+
+import numpy as np
+
+from vlarl_infra.envs.base_env import Observation, copy_observation
+from vlarl_infra.transport.codecs import ObservationEncoder
+
+FEEDBACK_BATCH = "feedback_batch"
+
+
+class FeedbackChannel:
+    """Encodes infer observations and feedback for one agent connection.
+
+    Use `encode_infer` for every infer so that `obs_ref` indices line up with the messages the server received.
+    `prepare` encodes feedback on the calling thread (frame streams are order-sensitive) and returns the send
+    call, or None when the record was only queued; the send call can be run later, e.g. on an executor.
+    With `copy_obs`, observations kept in pending batched records are copied first, for envs that reuse their
+    observation buffers.
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        encoder: ObservationEncoder,
+        mode: Literal["per-chunk", "batched"] = "per-chunk",
+        batch_size: int = 8,
+        obs_mode: Literal["full", "ref", "none"] = "ref",
+        copy_obs: bool = False,
+    ):
+        if mode == "batched" and not hasattr(agent, "feedback_batch"):
+            raise ValueError(f"{type(agent).__name__} does not support batched feedback")
+        self.agent = agent
+        self.encoder = encoder
+        self.mode = mode
+        self.batch_size = batch_size
+        self.obs_mode = obs_mode
+        self.copy_obs = copy_obs
+        self._num_infers = 0
+        self._records: list[dict] = []
+
+    def encode_infer(self, obs: Observation) -> dict:
+        self._num_infers += 1
+        return self.encoder.encode(obs)
+
+    def prepare(self, obs: Observation, reward: Any, terminated: Any, truncated: Any, info: Any) -> Callable[[], Any] | None:
+        if self.mode == "per-chunk":
+            wire = self.encoder.encode(obs)
+            return lambda: self.agent.feedback(wire, reward, terminated, truncated, info)
+
+        done = bool(np.any(terminated) or np.any(truncated))
+        record = dict(reward=reward, terminated=terminated, truncated=truncated, info=info)
+        if self.obs_mode == "ref" and not done:
+            record["obs_ref"] = self._num_infers
+        elif self.obs_mode != "none":
+            # Batched records reach the server after later infers, so they must not use the frame stream.
+            record["obs"] = self.encoder.encode(copy_observation(obs) if self.copy_obs else obs, use_frame_stream=False)
+        self._records.append(record)
+        if done or len(self._records) >= self.batch_size:
+            return self.prepare_flush()
+        return None
+
+    def prepare_flush(self) -> Callable[[], Any] | None:
+        if not self._records:
+            return None
+        records, self._records = self._records, []
+        return lambda: self.agent.feedback_batch(records)
+
+    def feedback(self, obs: Observation, reward: Any, terminated: Any, truncated: Any, info: Any) -> Any:
+        send = self.prepare(obs, reward, terminated, truncated, info)
+        return send() if send is not None else None
+
+    def flush(self) -> Any:
+        send = self.prepare_flush()
+        return send() if send is not None else None
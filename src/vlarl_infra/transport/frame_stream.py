@@ -0,0 +1,74 @@
+"""Delta encoding of stacked frames, e.g. the four `"0".."3"` images of `AtariEnv`.
+
+Consecutive frame stacks overlap: after one env step, three of the four frames were already sent. The encoder
+detects how far the stack has shifted since the last message and only sends the new frames, tagged with a running
+sequence number. The decoder keeps the last stack per connection and rebuilds the full observation. The first
+message after `reset()`, or after a shift that cannot be matched, is a keyframe holding the whole stack.
+
+Deltas only happen when fewer steps than the stack size pass between two encoded stacks, i.e. with `replan_steps`
+below the stack size. With the usual action chunks of 8 or more steps and a stack of 4 frames, every infer is a
+keyframe.
+"""
+import numpy as np
+
+
+class FrameStackEncoder:
+    def __init__(self, keys: list[str]):
+        # Stack keys ordered from the oldest to the newest frame.
+        self.keys = keys
+        self._last: list[np.ndarray] | None = None
+        self._seq = 0
+
+    def reset(self):
+        self._last = None
+
+    def _shift(self, frames: list[np.ndarray]) -> int | None:
+        if self._last is None:
+            return None
+        n = len(frames)
+        for shift in range(n):
+            if all(
+                frames[i].shape == self._last[i + shift].shape and np.array_equal(frames[i], self._last[i + shift])
+                for i in range(n - shift)
+            ):
+                return shift
+        return None
+
+    def encode(self, wire: dict) -> dict:
+        frames = [wire["images"].pop(key) for key in self.keys]
+        shift = self._shift(frames)
+        keyframe = shift is None
+        new_frames = frames if keyframe else frames[len(frames) - shift:]
+        self._seq += len(new_frames)
+        self._last = [frame.copy() for frame in frames]
+        wire["frame_stream"] = {
+            "keys": self.keys,
+            "seq": self._seq,
+            "keyframe": keyframe,
+            "frames": np.stack(new_frames) if new_frames else np.zeros((0, *frames[0].shape), dtype=frames[0].dtype),
+        }
+        return wire
+
+
+class FrameStackDecoder:
+    """Rebuilds stacks sent by a `FrameStackEncoder`. Keep one instance per connection."""
+
+    def __init__(self):
+        self._stack: list[np.ndarray] | None = None
+        self._seq = 0
+
+    def decode(self, wire: dict) -> dict:
+        stream = wire.pop("frame_stream", None)
+        if stream is None:
+            return wire
+        keys, frames = stream["keys"], list(stream["frames"])
+        if stream["keyframe"]:
+            self._stack = frames
+        else:
+            if self._stack is None or stream["seq"] - self._seq != len(frames):
+                raise RuntimeError(f"Frame stream out of sync: expected seq {self._seq + len(frames)}, got {stream['seq']}")
+            self._stack = (self._stack + frames)[-len(keys):]
+        self._seq = stream["seq"]
+        for key, frame in zip(keys, self._stack):
+            wire["images"][key] = frame
+        return wire
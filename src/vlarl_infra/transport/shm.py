@@ -0,0 +1,154 @@
+"""Shared-memory observation channel for a worker and a policy server on the same node.
+
+The worker copies large arrays once into a `multiprocessing.shared_memory` ring buffer and only sends small
+descriptors (segment name, offset, dtype, shape) over the socket. The server resolves them with
+`SharedMemoryReader`.
+
+The ring holds `num_slots` messages before data is overwritten. With the INFER -> ACTION handshake the server has
+finished with every earlier message once an ACTION arrives, so a handful of slots is enough, as long as the server
+copies any array it keeps beyond the current request (`SharedMemoryReader.resolve` copies by default).
+"""
+import sys
+import weakref
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+from loguru import logger
+
+from vlarl_infra.transport.wire import INLINE_THRESHOLD
+
+_ALIGNMENT = 64
+# Segments created by rings in this process, so an in-process reader does not untrack them.
+_OWNED_SEGMENTS: set[str] = set()
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _release(segments: list[shared_memory.SharedMemory]):
+    for shm in segments:
+        _OWNED_SEGMENTS.discard(shm.name)
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def is_descriptor(obj: Any) -> bool:
+    return isinstance(obj, dict) and b"__shm__" in obj
+
+
+class SharedMemoryRing:
+    """Writer side: copies arrays into a shared-memory ring and returns descriptors for them."""
+
+    def __init__(self, num_slots: int = 4):
+        assert num_slots >= 2, "The ring needs at least two slots"
+        self.num_slots = num_slots
+        self._shm: shared_memory.SharedMemory | None = None
+        self._slot_bytes = 0
+        self._cursor = 0
+        # Retired segments stay mapped until close: the server may still be reading from them.
+        self._segments: list[shared_memory.SharedMemory] = []
+        self._finalizer = weakref.finalize(self, _release, self._segments)
+
+    def _allocate(self, message_bytes: int):
+        self._slot_bytes = _align(message_bytes)
+        self._shm = shared_memory.SharedMemory(create=True, size=self._slot_bytes * self.num_slots)
+        self._segments.append(self._shm)
+        _OWNED_SEGMENTS.add(self._shm.name)
+        self._cursor = 0
+        logger.debug(f"Allocated shared memory segment {self._shm.name} of {self._shm.size} bytes")
+
+    def _large_arrays(self, obj: Any, out: list[np.ndarray]) -> list[np.ndarray]:
+        if isinstance(obj, dict):
+            for value in obj.values():
+                self._large_arrays(value, out)
+        elif isinstance(obj, (list, tuple)):
+            for value in obj:
+                self._large_arrays(value, out)
+        elif isinstance(obj, np.ndarray) and obj.nbytes >= INLINE_THRESHOLD:
+            out.append(obj)
+        return out
+
+    def _write(self, array: np.ndarray) -> dict:
+        assert self._shm is not None
+        offset = _align(self._cursor)
+        if offset + array.nbytes > self._shm.size:
+            offset = 0
+        dst = np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf, offset=offset)
+        dst[...] = array
+        self._cursor = offset + array.nbytes
+        return {
+            b"__shm__": True,
+            b"name": self._shm.name,
+            b"offset": offset,
+            b"dtype": array.dtype.str,
+            b"shape": array.shape,
+        }
+
+    def _replace(self, obj: Any) -> Any:
+        if isinstance(obj, dict):
+            return {k: self._replace(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return type(obj)(self._replace(v) for v in obj)
+        if isinstance(obj, np.ndarray) and obj.nbytes >= INLINE_THRESHOLD:
+            return self._write(obj)
+        return obj
+
+    def encode(self, data: Any) -> Any:
+        """Returns a copy of the `data` structure with its large arrays replaced by shared-memory descriptors."""
+        message_bytes = sum(_align(a.nbytes) for a in self._large_arrays(data, []))
+        if message_bytes == 0:
+            return data
+        if message_bytes > self._slot_bytes:
+            self._allocate(message_bytes)
+        return self._replace(data)
+
+    def close(self):
+        self._finalizer()
+
+
+class SharedMemoryReader:
+    """Reader side: attaches to the worker's segments by name and turns descriptors back into arrays."""
+
+    def __init__(self):
+        self._segments: dict[str, shared_memory.SharedMemory] = {}
+
+    def _attach(self, name: str) -> shared_memory.SharedMemory:
+        if name not in self._segments:
+            if name in _OWNED_SEGMENTS:
+                shm = shared_memory.SharedMemory(name=name)
+            elif sys.version_info >= (3, 13):
+                shm = shared_memory.SharedMemory(name=name, track=False)
+            else:
+                from multiprocessing import resource_tracker
+
+                shm = shared_memory.SharedMemory(name=name)
+                # The writer owns the segment; don't let this process unlink it on exit.
+                resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+            self._segments[name] = shm
+        return self._segments[name]
+
+    def resolve(self, obj: Any, copy: bool = True) -> Any:
+        """Replaces descriptors in `obj` with arrays. With `copy=False` the arrays alias the ring buffer and are
+        only valid until the worker sends `num_slots` more messages."""
+        if is_descriptor(obj):
+            shm = self._attach(obj[b"name"])
+            array = np.ndarray(tuple(obj[b"shape"]), dtype=np.dtype(obj[b"dtype"]), buffer=shm.buf, offset=obj[b"offset"])
+            return array.copy() if copy else array
+        if isinstance(obj, dict):
+            return {k: self.resolve(v, copy) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self.resolve(v, copy) for v in obj]
+        return obj
+
+    def close(self):
+        for shm in self._segments.values():
+            try:
+                shm.close()
+            except BufferError:
+                logger.warning(f"Arrays resolved with copy=False still reference {shm.name}; leaving it mapped.")
+        self._segments.clear()
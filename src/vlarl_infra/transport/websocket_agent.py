@@ -0,0 +1,76 @@
+from typing import Any
+
+from loguru import logger
+from websockets.sync.client import connect, ClientConnection
+from vlarl_client.websocket_worker_agent import MessageType
+
+from vlarl_infra.transport import wire
+from vlarl_infra.transport.feedback import FEEDBACK_BATCH
+from vlarl_infra.transport.shm import SharedMemoryRing
+
+
+class ZeroCopyWorkerAgent:
+    """Worker agent speaking the same protocol as `vlarl_client`'s `WebSocketWorkerAgent`.
+
+    Messages are sent as fragmented websocket frames built by `wire.pack_fragments`, so image buffers go from the
+    observation to the socket without being copied on the way.
+    """
+    _ws: ClientConnection
+    _server_metadata: Any
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8000):
+        self._uri = f"ws://{host}:{port}"
+        logger.info(f"Connecting to {self._uri}")
+        self._ws = connect(self._uri, compression=None, max_size=None)
+        self._server_metadata = self._recv(MessageType.METADATA)
+
+    def get_server_metadata(self) -> Any:
+        return self._server_metadata
+
+    def _send(self, message_type: MessageType | str, data: Any):
+        fragments = wire.pack_fragments(dict(message_type=str(message_type), data=data))
+        self._ws.send(fragments[0] if len(fragments) == 1 else fragments)
+
+    def _recv(self, message_type: MessageType) -> Any:
+        message = wire.unpackb(self._ws.recv())
+        if message.get("message_type") != str(message_type):
+            raise RuntimeError(f"Expected a {message_type} message but received: {message.get('message_type')}")
+        return message.get("data")
+
+    def infer(self, obs: dict) -> dict:
+        self._send(MessageType.INFER, obs)
+        return self._recv(MessageType.ACTION)
+
+    def feedback(self, obs: dict, reward: Any, terminated: Any, truncated: Any, info: Any):
+        self._send(MessageType.FEEDBACK, dict(obs=obs, reward=reward, terminated=terminated, truncated=truncated, info=info))
+
+    def feedback_batch(self, records: list[dict]):
+        """Sends several feedback records in one message, see `vlarl_infra.transport.feedback`."""
+        self._send(FEEDBACK_BATCH, dict(records=records))
+
+    def close(self):
+        self._ws.close()
+
+
+class SharedMemoryWorkerAgent(ZeroCopyWorkerAgent):
+    """Worker agent for a policy server on the same node.
+
+    Large arrays are written to a shared-memory ring and only their descriptors go over the socket; the server
+    resolves them with `vlarl_infra.transport.shm.SharedMemoryReader`.
+    """
+    _ring: SharedMemoryRing
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8000, num_slots: int = 4):
+        self._ring = SharedMemoryRing(num_slots=num_slots)
+        try:
+            super().__init__(host=host, port=port)
+        except BaseException:
+            self._ring.close()
+            raise
+
+    def _send(self, message_type: MessageType | str, data: Any):
+        super()._send(message_type, self._ring.encode(data))
+
+    def close(self):
+        super().close()
+        self._ring.close()
@@ -0,0 +1,119 @@
+"""Copy-free msgpack encoding of observations.
+
+The wire format is the one used by `vlarl_client.msgpack_numpy`, so anything packed here can be decoded by the
+policy server unchanged. The difference is on the encoding side: large array payloads are handed to the socket as
+memoryviews of the original buffers instead of being copied by `ndarray.tobytes()` and again into the packer
+buffer.
+"""
+import struct
+from typing import Any
+
+import msgpack
+import numpy as np
+
+# Arrays smaller than this are packed inline; giving them their own fragment costs more than the copy.
+INLINE_THRESHOLD = 64 * 1024
+
+
+def _check_dtype(obj: np.ndarray | np.generic):
+    if obj.dtype.kind in ("V", "O", "c"):
+        raise ValueError(f"Unsupported dtype: {obj.dtype}")
+
+
+def _array_buffer(obj: np.ndarray) -> memoryview:
+    if not obj.flags.c_contiguous:
+        obj = np.ascontiguousarray(obj)
+    return obj.reshape(-1).view(np.uint8).data
+
+
+def _bin_header(size: int) -> bytes:
+    if size < 2**8:
+        return struct.pack(">BB", 0xC4, size)
+    if size < 2**16:
+        return struct.pack(">BH", 0xC5, size)
+    return struct.pack(">BI", 0xC6, size)
+
+
+def pack_array(obj: Any) -> Any:
+    """`default` hook for `msgpack.Packer` that packs arrays from a memoryview rather than `tobytes()`."""
+    if isinstance(obj, np.ndarray):
+        _check_dtype(obj)
+        return {b"__ndarray__": True, b"data": _array_buffer(obj), b"dtype": obj.dtype.str, b"shape": obj.shape}
+    if isinstance(obj, np.generic):
+        _check_dtype(obj)
+        return {b"__npgeneric__": True, b"data": obj.item(), b"dtype": obj.dtype.str}
+    return obj
+
+
+def unpack_array(obj: dict) -> Any:
+    if b"__ndarray__" in obj:
+        return np.ndarray(buffer=obj[b"data"], dtype=np.dtype(obj[b"dtype"]), shape=obj[b"shape"])
+    if b"__npgeneric__" in obj:
+        return np.dtype(obj[b"dtype"]).type(obj[b"data"])
+    return obj
+
+
+class _FragmentWriter:
+    def __init__(self):
+        self.packer = msgpack.Packer(default=pack_array)
+        self.fragments: list[bytes | memoryview] = []
+        self._head = bytearray()
+
+    def write(self, data: bytes):
+        self._head += data
+
+    def write_buffer(self, data: memoryview):
+        self._flush()
+        self.fragments.append(data)
+
+    def _flush(self):
+        if self._head:
+            self.fragments.append(bytes(self._head))
+            self._head = bytearray()
+
+    def finish(self) -> list[bytes | memoryview]:
+        self._flush()
+        return self.fragments
+
+
+def _walk(writer: _FragmentWriter, obj: Any):
+    packer = writer.packer
+    if isinstance(obj, dict):
+        writer.write(packer.pack_map_header(len(obj)))
+        for key, value in obj.items():
+            _walk(writer, key)
+            _walk(writer, value)
+    elif isinstance(obj, (list, tuple)):
+        writer.write(packer.pack_array_header(len(obj)))
+        for value in obj:
+            _walk(writer, value)
+    elif isinstance(obj, np.ndarray) and obj.nbytes >= INLINE_THRESHOLD:
+        _check_dtype(obj)
+        data = _array_buffer(obj)
+        writer.write(packer.pack_map_header(4))
+        writer.write(packer.pack(b"__ndarray__") + packer.pack(True))
+        writer.write(packer.pack(b"data") + _bin_header(data.nbytes))
+        writer.write_buffer(data)
+        writer.write(packer.pack(b"dtype") + packer.pack(obj.dtype.str))
+        writer.write(packer.pack(b"shape") + packer.pack(obj.shape))
+    else:
+        writer.write(packer.pack(obj))
+
+
+def pack_fragments(obj: Any) -> list[bytes | memoryview]:
+    """Packs `obj` into a list of fragments whose concatenation is a regular msgpack message.
+
+    Large arrays become memoryviews of their own buffers, so a fragmented websocket send puts them on the socket
+    without any intermediate copy.
+    """
+    writer = _FragmentWriter()
+    _walk(writer, obj)
+    return writer.finish()
+
+
+def packb(obj: Any) -> bytes:
+    return b"".join(pack_fragments(obj))
+
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, object_hook=unpack_array)
@@ -0,0 +1,101 @@
+"""CPU affinity and thread-pool limits for simulator workers.
+
+MuJoCo, ALE, BLAS (through numpy) and OpenCV each size their thread pools to the whole machine. With many workers
+per node that oversubscribes the cores, so each worker can be pinned to a core set and its thread pools capped to
+a few threads. Limits are set through the usual environment variables, which libraries loaded later (e.g. by the
+env) pick up, and directly on OpenCV, torch and, when `threadpoolctl` is installed, the BLAS/OpenMP pools when they
+are already loaded.
+"""
+import os
+import sys
+
+from loguru import logger
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None  # type: ignore[assignment]
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    # Read by OpenCV when it is imported.
+    "OPENCV_FOR_THREADS_NUM",
+)
+
+
+def parse_cpu_list(spec: str) -> list[int]:
+    """Parses a core list in `taskset -c` syntax, e.g. `0-3,8,10-11`."""
+    cpus: list[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, stop = part.split("-")
+            cpus.extend(range(int(start), int(stop) + 1))
+        elif part:
+            cpus.append(int(part))
+    if not cpus:
+        raise ValueError(f"Empty CPU list: {spec!r}")
+    return cpus
+
+
+def format_cpu_list(cpus: list[int] | set[int]) -> str:
+    """Inverse of `parse_cpu_list`, with consecutive cores merged into ranges."""
+    ranges: list[list[int]] = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def available_cpus() -> list[int]:
+    """Cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def set_affinity(cpus: list[int] | set[int]) -> bool:
+    """Pins the calling process (and the processes it starts afterwards) to `cpus`. Returns False if unsupported."""
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("CPU pinning is not supported on this platform")
+        return False
+    os.sched_setaffinity(0, set(cpus))
+    return True
+
+
+def limit_threads(num_threads: int):
+    """Caps the thread pools of this process and of the processes it starts afterwards at `num_threads`."""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(num_threads)
+    # Only if something already imported them: importing OpenCV or torch just to configure them would be slow, and
+    # a later import of OpenCV reads OPENCV_FOR_THREADS_NUM.
+    if "cv2" in sys.modules:
+        sys.modules["cv2"].setNumThreads(num_threads)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(num_threads)
+    if threadpoolctl is not None:
+        threadpoolctl.threadpool_limits(limits=num_threads)
+
+
+def thread_report() -> dict:
+    """The effective affinity and thread settings of this process."""
+    report: dict = {
+        "cpus": format_cpu_list(available_cpus()),
+        "env": {var: os.environ[var] for var in THREAD_ENV_VARS if var in os.environ},
+    }
+    if "cv2" in sys.modules:
+        report["opencv"] = sys.modules["cv2"].getNumThreads()
+    if "torch" in sys.modules:
+        report["torch"] = sys.modules["torch"].get_num_threads()
+    if threadpoolctl is not None:
+        report["threadpools"] = {
+            f"{pool['internal_api']} ({os.path.basename(pool['filepath'])})": pool["num_threads"]
+            for pool in threadpoolctl.threadpool_info()
+        }
+    return report
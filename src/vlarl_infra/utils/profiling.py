@@ -0,0 +1,260 @@
+"""Per-phase timing of the worker step loop.
+
+Phases are timed with `StepProfiler.phase` and kept in log-bucketed histograms (in the spirit of HdrHistogram:
+fixed memory, bounded relative error), so percentiles stay cheap to compute however long the worker runs. Phases
+can be nested; the inner phase is reported as `outer/inner`. `ProfileWrapper` measures the time spent in a single
+wrapper layer of the env, excluding the layers it wraps.
+"""
+import abc
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, Iterator, Literal, TypeVar
+
+import numpy as np
+from gymnasium.core import Env, Wrapper
+
+T = TypeVar("T")
+
+
+class LatencyHistogram:
+    """Histogram of durations in seconds with buckets growing by `precision` (1% by default)."""
+
+    def __init__(self, min_value: float = 1e-6, max_value: float = 1e3, precision: float = 0.01):
+        self.min_value = min_value
+        self._log_base = math.log1p(precision)
+        self.counts = np.zeros(int(math.ceil(math.log(max_value / min_value) / self._log_base)) + 2, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float):
+        if value <= self.min_value:
+            index = 0
+        else:
+            index = min(int(math.log(value / self.min_value) / self._log_base) + 1, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Adds the counts of a histogram with the same bucket layout, e.g. one returned by another process."""
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q`-th percentile, capped at the largest recorded value."""
+        if self.count == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), math.ceil(q / 100 * self.count)))
+        return min(self.min_value * math.exp(index * self._log_base), self.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / max(self.count, 1)
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class StepProfiler:
+    """Collects phase durations for the current episode and for the whole run.
+
+    A disabled profiler hands out no-op phases, so the step loop can be instrumented unconditionally.
+    """
+
+    def __init__(self, enabled: bool = True, sinks: list["ProfileSink"] | None = None):
+        self.enabled = enabled
+        self.sinks = sinks or []
+        self.episode: dict[str, LatencyHistogram] = {}
+        self.total: dict[str, LatencyHistogram] = {}
+        self.episode_count = 0
+        self.total_steps = 0
+        self._episode_start = time.perf_counter()
+        self._run_start = self._episode_start
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> list[str]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def path(self, name: str) -> str:
+        return "/".join([*self._stack(), name])
+
+    def record(self, name: str, seconds: float):
+        """Records a duration under `name`, nested in the phases open on the calling thread."""
+        path = self.path(name)
+        with self._lock:
+            for histograms in (self.episode, self.total):
+                if path not in histograms:
+                    histograms[path] = LatencyHistogram()
+                histograms[path].record(seconds)
+
+    @contextlib.contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        stack = self._stack()
+        start = time.perf_counter()
+        stack.append(name)
+        try:
+            yield
+        finally:
+            stack.pop()
+            self.record(name, time.perf_counter() - start)
+
+    def phase(self, name: str) -> contextlib.AbstractContextManager:
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._phase(name)
+
+    def timed(self, name: str, fn: Callable[..., T]) -> Callable[..., T]:
+        """Wraps `fn` so each call is recorded as a phase, e.g. for calls submitted to an executor."""
+        if not self.enabled:
+            return fn
+
+        def wrapper(*args, **kwargs):
+            with self._phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def begin_episode(self):
+        with self._lock:
+            self.episode = {}
+        self._episode_start = time.perf_counter()
+
+    def end_episode(self, num_steps: int) -> dict:
+        """Summarizes the episode, passes the summary to every sink and returns it.
+
+        Sinks are written even when profiling is disabled; the summary then has no phases."""
+        elapsed = time.perf_counter() - self._episode_start
+        self.episode_count += 1
+        self.total_steps += num_steps
+        with self._lock:
+            summary = {
+                "episode": self.episode_count - 1,
+                "steps": num_steps,
+                "seconds": elapsed,
+                "steps_per_second": num_steps / max(elapsed, 1e-9),
+                "phases": {name: h.summary() for name, h in self.episode.items()},
+            }
+        for sink in self.sinks:
+            sink.write(self, summary)
+        return summary
+
+    @property
+    def total_steps_per_second(self) -> float:
+        return self.total_steps / max(time.perf_counter() - self._run_start, 1e-9)
+
+    @staticmethod
+    def format(summary: dict) -> str:
+        phases = " | ".join(
+            f"{name} p50 {s['p50'] * 1e3:.2f} p95 {s['p95'] * 1e3:.2f} p99 {s['p99'] * 1e3:.2f} ms"
+            for name, s in summary["phases"].items()
+        )
+        return f"{summary['steps_per_second']:.1f} steps/s | {phases}"
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class ProfileSink(abc.ABC):
+    @abc.abstractmethod
+    def write(self, profiler: StepProfiler, summary: dict):
+        ...
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink(ProfileSink):
+    """Appends one JSON object per episode."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a")
+
+    def write(self, profiler: StepProfiler, summary: dict):
+        self._file.write(json.dumps({"time": time.time(), **summary}) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class PrometheusSink(ProfileSink):
+    """Rewrites a Prometheus text-format file with the run totals, e.g. for the node exporter's textfile collector."""
+
+    def __init__(self, path: str, labels: dict[str, str] | None = None):
+        self.path = path
+        self.labels = labels or {}
+
+    def _labels(self, **extra: str) -> str:
+        labels = {**self.labels, **extra}
+        return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else ""
+
+    def write(self, profiler: StepProfiler, summary: dict):
+        lines = [
+            "# HELP vlarl_worker_phase_seconds Duration of the phases of the worker step loop.",
+            "# TYPE vlarl_worker_phase_seconds summary",
+        ]
+        with profiler._lock:
+            for name, h in profiler.total.items():
+                for q in (0.5, 0.95, 0.99):
+                    lines.append(f"vlarl_worker_phase_seconds{self._labels(phase=name, quantile=str(q))} {h.percentile(q * 100)}")
+                lines.append(f"vlarl_worker_phase_seconds_sum{self._labels(phase=name)} {h.total}")
+                lines.append(f"vlarl_worker_phase_seconds_count{self._labels(phase=name)} {h.count}")
+        lines += [
+            "# TYPE vlarl_worker_steps_total counter",
+            f"vlarl_worker_steps_total{self._labels()} {profiler.total_steps}",
+            "# TYPE vlarl_worker_episodes_total counter",
+            f"vlarl_worker_episodes_total{self._labels()} {profiler.episode_count}",
+            "# TYPE vlarl_worker_steps_per_second gauge",
+            f"vlarl_worker_steps_per_second{self._labels()} {profiler.total_steps_per_second}",
+        ]
+        # Write and rename so the collector never reads a partial file.
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+def make_sink(path: str, format: Literal["jsonl", "prometheus"]) -> ProfileSink:
+    if format == "prometheus":
+        return PrometheusSink(path)
+    return JsonLinesSink(path)
+
+
+class ProfileWrapper(Wrapper):
+    """Records the time spent in the wrapped layer's `step` as phase `name`.
+
+    Nested `ProfileWrapper`s report exclusive times: the time of the inner profiled layers is subtracted, so
+    inserting one above each wrapper gives the overhead of every wrapper on its own.
+    """
+    def __init__(self, env: Env, profiler: StepProfiler, name: str):
+        super().__init__(env)
+        self.profiler = profiler
+        self.name = name
+
+    def step(self, action):
+        local = self.profiler._local
+        local.layer_time = 0.0
+        start = time.perf_counter()
+        result = self.env.step(action)
+        elapsed = time.perf_counter() - start
+        self.profiler.record(self.name, elapsed - local.layer_time)
+        local.layer_time = elapsed
+        return result
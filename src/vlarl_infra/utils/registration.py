@@ -2,6 +2,8 @@
 from typing import Type, Dict, List, TYPE_CHECKING
 from copy import deepcopy
 from functools import partial
+import importlib
+import importlib.util
 import json
 import difflib
 
@@ -133,4 +135,40 @@ def get_env_config(uid: str) -> BaseEnvConfig:
         if close_matches:
             msg += f" Did you mean {close_matches}?"
         raise KeyError(msg)
-    return REGISTERED_ENV_CONFIGS[uid]
\ No newline at end of file
+    return REGISTERED_ENV_CONFIGS[uid]
+
+class LazyEnvEntry:
+    def __init__(self, uid: str, entry_point: str, requires: tuple[str, ...] = ()):
+        self.uid = uid
+        self.entry_point = entry_point
+        self.requires = requires
+
+    @property
+    def module(self) -> str:
+        return self.entry_point.split(":")[0]
+
+LAZY_ENVS: Dict[str, LazyEnvEntry] = {}
+
+def register_env_entry_point(uid: str, entry_point: str, requires: tuple[str, ...] = ()):
+    """Declares an env by `module:Class` entry point without importing it.
+
+    The module, whose `register_env` decorator performs the actual registration, is only imported by `load_env`,
+    so simulators that are installed but not selected cost nothing at startup. `requires` lists the top-level
+    modules the env family needs; they are looked up, not imported, by `is_env_available`.
+    """
+    LAZY_ENVS[uid] = LazyEnvEntry(uid, entry_point, requires)
+
+def is_env_available(uid: str) -> bool:
+    if uid not in LAZY_ENVS:
+        return True
+    return all(importlib.util.find_spec(module) is not None for module in LAZY_ENVS[uid].requires)
+
+def load_env(uid: str) -> Type[BaseEnv]:
+    """Imports the module of a lazily declared env if needed and returns its class."""
+    if uid not in REGISTERED_ENVS and uid in LAZY_ENVS:
+        entry = LAZY_ENVS[uid]
+        module_name, _, attr = entry.entry_point.partition(":")
+        getattr(importlib.import_module(module_name), attr)
+    if uid not in REGISTERED_ENVS:
+        raise KeyError("Env {} not found in registry".format(uid))
+    return REGISTERED_ENVS[uid].cls
\ No newline at end of file
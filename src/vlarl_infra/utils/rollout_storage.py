@@ -0,0 +1,261 @@
+"""Chunked columnar on-disk storage for rollouts.
+
+Layout of a rollout directory::
+
+    index.jsonl                      one line per finished episode
+    episode_000000/
+        meta.json                    columns with dtype, row shape and shard boundaries
+        obs.images.agentview/000000.npy
+        obs.images.agentview/000001.npy
+        action/000000.npy
+        ...
+
+Every column is split into `.npy` shards of about `chunk_bytes` each (between one and `MAX_CHUNK_ROWS` rows), so
+the reader can memory-map any part of an episode without loading whole files. Observation columns (`obs.images.*`, `obs.states.*`) hold `num_steps + 1`
+rows, starting with the reset observation; `action`, `reward`, `terminated` and `truncated` hold `num_steps` rows.
+"""
+import bisect
+import json
+import pathlib
+import queue
+import threading
+from typing import Any, Callable
+
+import numpy as np
+from loguru import logger
+
+from vlarl_infra.envs.base_env import Observation
+
+INDEX_FILE = "index.jsonl"
+META_FILE = "meta.json"
+# Small columns (actions, rewards, flags) would otherwise preallocate millions of rows per chunk.
+MAX_CHUNK_ROWS = 1024
+
+
+def _to_json(obj: Any) -> Any:
+    return json.loads(json.dumps(obj, default=lambda o: o.item() if isinstance(o, np.generic) else str(o)))
+
+
+def _observation_columns(obs: Observation) -> dict[str, np.ndarray]:
+    columns = {f"obs.images.{k}": v for k, v in obs.images.items()}
+    columns.update({f"obs.states.{k}": np.asarray(v) for k, v in obs.states.items()})
+    return columns
+
+
+class _ColumnBuffer:
+    def __init__(self, name: str, row: np.ndarray, chunk_bytes: int):
+        self.name = name
+        self.dtype = row.dtype
+        self.row_shape = row.shape
+        # Sized in bytes so that a column of large frames does not preallocate hundreds of them.
+        self.chunk_size = min(max(1, chunk_bytes // max(row.nbytes, 1)), MAX_CHUNK_ROWS)
+        self.shards: list[tuple[int, int]] = []
+        self.num_rows = 0
+        self._buffer = np.empty((self.chunk_size, *row.shape), dtype=row.dtype)
+        self._fill = 0
+
+    def append(self, row: np.ndarray, flush: Callable[[str, int, np.ndarray], None]):
+        # Copy now: envs may reuse their output buffers on the next step.
+        self._buffer[self._fill] = row
+        self._fill += 1
+        self.num_rows += 1
+        if self._fill == self.chunk_size:
+            self.flush(flush)
+
+    def flush(self, flush: Callable[[str, int, np.ndarray], None]):
+        if self._fill == 0:
+            return
+        flush(self.name, len(self.shards), self._buffer[:self._fill])
+        self.shards.append((self.num_rows - self._fill, self.num_rows))
+        self._buffer = np.empty((self.chunk_size, *self.row_shape), dtype=self.dtype)
+        self._fill = 0
+
+    def meta(self) -> dict:
+        return {"dtype": self.dtype.str, "shape": list(self.row_shape), "shards": [list(s) for s in self.shards]}
+
+
+class RolloutWriter:
+    """Appends episodes to a rollout directory.
+
+    Rows are copied into in-memory chunks of about `chunk_bytes` per column on the calling thread; full chunks are
+    saved by a background thread, so the step loop only blocks on disk when more than `max_pending` chunks are
+    waiting to be written. Memory use is bounded by roughly `(num_columns + max_pending) * chunk_bytes`.
+
+    New episodes are numbered after the highest existing `episode_*` directory, so the directory of an episode
+    left half-written by a crash is never reused; it is not listed in the index either.
+    """
+
+    def __init__(self, root: str | pathlib.Path, chunk_bytes: int = 64 << 20, max_pending: int = 4):
+        self.root = pathlib.Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_bytes = chunk_bytes
+        numbers = [int(p.name[len("episode_"):]) for p in self.root.glob("episode_*") if p.name[len("episode_"):].isdigit()]
+        self._next_episode = max(numbers, default=-1) + 1
+        self._columns: dict[str, _ColumnBuffer] | None = None
+        self._episode_dir: pathlib.Path | None = None
+        self._text = ""
+        self._return = 0.0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="rollout-writer")
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                break
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"Failed to write rollout data: {e}")
+
+    def _save_shard(self, name: str, shard: int, array: np.ndarray):
+        path = self._episode_dir / name / f"{shard:06d}.npy"
+        self._queue.put(lambda: (path.parent.mkdir(parents=True, exist_ok=True), np.save(path, array)))
+
+    def _append(self, name: str, row: np.ndarray):
+        assert self._columns is not None, "begin_episode must be called first"
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = _ColumnBuffer(name, row, self.chunk_bytes)
+        column.append(row, self._save_shard)
+
+    @property
+    def in_episode(self) -> bool:
+        return self._columns is not None
+
+    def begin_episode(self, obs: Observation):
+        if self.in_episode:
+            self.end_episode()
+        self._episode_dir = self.root / f"episode_{self._next_episode:06d}"
+        self._next_episode += 1
+        self._columns = {}
+        self._text = obs.text
+        self._return = 0.0
+        for name, value in _observation_columns(obs).items():
+            self._append(name, value)
+
+    def append_step(self, action: Any, obs: Observation, reward: float, terminated: bool, truncated: bool):
+        self._append("action", np.asarray(action))
+        self._append("reward", np.asarray(reward, dtype=np.float32))
+        self._append("terminated", np.asarray(terminated, dtype=bool))
+        self._append("truncated", np.asarray(truncated, dtype=bool))
+        for name, value in _observation_columns(obs).items():
+            self._append(name, value)
+        self._return += float(reward)
+
+    def end_episode(self, info: dict | None = None):
+        if not self.in_episode:
+            return
+        assert self._columns is not None and self._episode_dir is not None
+        if "action" not in self._columns:
+            # Reset without any step, e.g. the auto-reset before a vector env is closed. Its number is reused
+            # unless a shard of the reset observation already went to disk.
+            if not any(column.shards for column in self._columns.values()):
+                self._next_episode -= 1
+            self._columns = None
+            self._episode_dir = None
+            return
+        for column in self._columns.values():
+            column.flush(self._save_shard)
+        num_steps = self._columns["action"].num_rows
+        meta = {
+            "num_steps": num_steps,
+            "text": self._text,
+            "columns": {name: column.meta() for name, column in self._columns.items()},
+        }
+        record = {
+            "episode": self._episode_dir.name,
+            "num_steps": num_steps,
+            "return": self._return,
+            "info": _to_json((info or {}).get("episode", {})),
+        }
+        episode_dir = self._episode_dir
+
+        def write_meta():
+            episode_dir.mkdir(exist_ok=True)
+            with open(episode_dir / META_FILE, "w") as f:
+                json.dump(meta, f)
+            with open(self.root / INDEX_FILE, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+        self._queue.put(write_meta)
+        self._columns = None
+        self._episode_dir = None
+
+    def close(self):
+        self.end_episode()
+        self._queue.put(None)
+        self._thread.join()
+
+
+class EpisodeReader:
+    """Memory-mapped access to one recorded episode."""
+
+    def __init__(self, path: str | pathlib.Path):
+        self.path = pathlib.Path(path)
+        with open(self.path / META_FILE) as f:
+            self.meta = json.load(f)
+        self.num_steps: int = self.meta["num_steps"]
+        self.text: str = self.meta["text"]
+        self._shards: dict[str, list[np.ndarray]] = {}
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.meta["columns"].keys())
+
+    def shards(self, name: str) -> list[np.ndarray]:
+        if name not in self._shards:
+            num_shards = len(self.meta["columns"][name]["shards"])
+            self._shards[name] = [np.load(self.path / name / f"{i:06d}.npy", mmap_mode="r") for i in range(num_shards)]
+        return self._shards[name]
+
+    def row(self, name: str, index: int) -> np.ndarray:
+        bounds = self.meta["columns"][name]["shards"]
+        shard = bisect.bisect_right([start for start, _ in bounds], index) - 1
+        return self.shards(name)[shard][index - bounds[shard][0]]
+
+    def rows(self, name: str, start: int, stop: int) -> np.ndarray:
+        """Copies rows `start:stop` of a column into memory."""
+        parts = [
+            shard[max(start, begin) - begin:min(stop, end) - begin]
+            for (begin, end), shard in zip(self.meta["columns"][name]["shards"], self.shards(name))
+            if begin < stop and end > start
+        ]
+        return np.concatenate(parts, axis=0)
+
+    def column(self, name: str) -> np.ndarray:
+        """Loads a whole column into memory."""
+        return np.concatenate(self.shards(name), axis=0)
+
+    def observation(self, t: int) -> Observation:
+        """Observation after `t` steps; `t = 0` is the reset observation."""
+        images, states = {}, {}
+        for name in self.columns:
+            if name.startswith("obs.images."):
+                images[name[len("obs.images."):]] = self.row(name, t)
+            elif name.startswith("obs.states."):
+                states[name[len("obs.states."):]] = self.row(name, t)
+        return Observation(images=images, states=states, text=self.text)
+
+
+class RolloutReader:
+    """Lists the episodes of a rollout directory, including those written by several ranks into subdirectories."""
+
+    def __init__(self, root: str | pathlib.Path):
+        self.root = pathlib.Path(root)
+        index_files = [self.root / INDEX_FILE] if (self.root / INDEX_FILE).exists() else sorted(self.root.glob(f"*/{INDEX_FILE}"))
+        self.records: list[dict] = []
+        for index in index_files:
+            with open(index) as f:
+                for line in f:
+                    record = json.loads(line)
+                    record["path"] = str(index.parent / record["episode"])
+                    self.records.append(record)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def episode(self, i: int) -> EpisodeReader:
+        return EpisodeReader(self.records[i]["path"])
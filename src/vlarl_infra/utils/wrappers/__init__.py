@@ -1,2 +1,3 @@
 from .remote_viewer_wrapper import RemoteViewerWrapper
-from .real_time_wrapper import RealTimeWrapper
\ No newline at end of file
+from .real_time_wrapper import RealTimeWrapper
+from .record_rollout_wrapper import RecordRolloutWrapper
\ No newline at end of file
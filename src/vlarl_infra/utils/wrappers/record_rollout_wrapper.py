@@ -0,0 +1,38 @@
+import pathlib
+from typing import Any
+
+from gymnasium.core import Env, Wrapper
+from loguru import logger
+
+from vlarl_infra.envs.base_env import request_render
+from vlarl_infra.utils.rollout_storage import RolloutWriter
+
+
+class RecordRolloutWrapper(Wrapper):
+    """Records every episode into a rollout directory, see `vlarl_infra.utils.rollout_storage`.
+
+    Steps are copied into in-memory chunks and written to disk by a background thread. Read the episodes back with
+    `RolloutReader`.
+    """
+    def __init__(self, env: Env, root_dir: str | pathlib.Path, chunk_bytes: int = 64 << 20):
+        super().__init__(env)
+        self.writer = RolloutWriter(root_dir, chunk_bytes=chunk_bytes)
+        logger.info(f"Recording rollouts to {root_dir}")
+
+    def reset(self, *, seed: int | None = None, options: dict[str, Any] | None = None):
+        obs, info = self.env.reset(seed=seed, options=options)
+        self.writer.begin_episode(obs)
+        return obs, info
+
+    def step(self, action):
+        # Every observation is recorded, so envs must not skip rendering any of them.
+        request_render(self.env)
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.writer.append_step(action, obs, reward, terminated, truncated)
+        if terminated or truncated:
+            self.writer.end_episode(info)
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self.writer.close()
+        self.env.close()
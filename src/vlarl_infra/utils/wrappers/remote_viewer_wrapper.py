@@ -1,78 +1,124 @@
 import asyncio
+import concurrent.futures
 import json
 import threading
+import time
 import websockets
-import dataclasses
+import msgpack
 import numpy as np
 from gymnasium.core import Env, Wrapper
-from typing import Any, Dict
-from vlarl_client import msgpack_numpy
+from typing import Any, Dict, Literal
 from loguru import logger
 import queue
 from PIL import Image
 import io
 import base64
 
-from vlarl_infra.envs.base_env import Observation
+from vlarl_infra.envs.base_env import Observation, copy_observation, request_render, reuses_obs_buffers
 
 
 class RemoteViewerCommunicator:
-    def __init__(self, websocket_uri: str):
+    """Streams observations to the remote viewer.
+
+    `start()` runs the connection in a background thread with its own event loop. An asyncio application can
+    instead schedule the `run()` coroutine on its own loop and call `stop()` when done.
+
+    `protocol="json"` sends base64 JPEGs inside JSON text frames. `protocol="msgpack"` sends binary msgpack frames
+    with the raw JPEG bytes, which skips base64 and JSON encoding. In both cases the cameras of an observation are
+    encoded in parallel and optionally downscaled so their longest side is at most `max_side`.
+
+    `stop()` ends the connection and releases the encode threads; the communicator can be started again afterwards.
+    """
+    frames_sent: int
+    frames_dropped: int
+
+    def __init__(
+        self,
+        websocket_uri: str,
+        protocol: Literal["json", "msgpack"] = "json",
+        max_side: int | None = None,
+        jpeg_quality: int = 75,
+        num_encode_threads: int = 4,
+    ):
         self.websocket_uri = websocket_uri
+        self.protocol = protocol
+        self.max_side = max_side
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.jpeg_quality = jpeg_quality
         self.data_queue = queue.Queue(maxsize=1)
         self._thread = None
         self._stop_event = threading.Event()
+        self.num_encode_threads = num_encode_threads
+        self._encode_pool: concurrent.futures.ThreadPoolExecutor | None = None
 
-    def _numpy_to_base64_jpeg(self, np_array: np.ndarray) -> str:
+    def _get_encode_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        # Created on first use, and again after `stop()` shut the previous one down.
+        if self._encode_pool is None:
+            self._encode_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.num_encode_threads, thread_name_prefix="viewer-encode"
+            )
+        return self._encode_pool
+
+    def _numpy_to_jpeg(self, np_array: np.ndarray) -> bytes:
         # If it's a grayscale image (2D array), convert to RGB first
         if np_array.ndim == 3 and np_array.shape[-1] == 1:
             img = Image.fromarray(np_array[..., 0], 'L')
-            img = img.convert("RGB")
         # If it's an RGB/RGBA image
         elif np_array.ndim == 3 and np_array.shape[-1] in [3, 4]:
             img = Image.fromarray(np_array)
         else:
             raise ValueError("Unsupported array shape for image conversion.")
 
+        # Frames from `RemoteViewerWrapper` already fit; this only applies when `send_data` is called directly.
+        if self.max_side is not None and max(img.size) > self.max_side:
+            scale = self.max_side / max(img.size)
+            size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+            img = img.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        img = img.convert("RGB")
+
         buffered = io.BytesIO()
-        img.save(buffered, format="JPEG")
-        img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        img.save(buffered, format="JPEG", quality=self.jpeg_quality)
+        return buffered.getvalue()
+
+    def _numpy_to_base64_jpeg(self, np_array: np.ndarray) -> str:
+        img_str = base64.b64encode(self._numpy_to_jpeg(np_array)).decode("utf-8")
         return f"data:image/jpeg;base64,{img_str}"
         
     def _serialize_observation(self, obs_obj: Observation) -> Dict[str, Any]:
-        """Converts the custom Observation object to a JSON-friendly dictionary."""
-        obs_dict = dataclasses.asdict(obs_obj)
-        
-        serialized_dict = {}
-        for key, value in obs_dict.items():
-            if isinstance(value, dict):
-                nested_dict = {}
-                for nested_key, nested_value in value.items():
-                    if isinstance(nested_value, np.ndarray):
-                        # For images, convert to base64 string
-                        if key == 'images':
-                            nested_dict[nested_key] = self._numpy_to_base64_jpeg(nested_value[0])
-                        # For states and other arrays, convert to list
-                        else:
-                            nested_dict[nested_key] = nested_value.tolist()
-                    else:
-                        nested_dict[nested_key] = nested_value
-                serialized_dict[key] = nested_dict
-            else:
-                serialized_dict[key] = value
-        return serialized_dict
+        """Converts the custom Observation object to a JSON-friendly (or msgpack-friendly) dictionary."""
+        encode = self._numpy_to_jpeg if self.protocol == "msgpack" else self._numpy_to_base64_jpeg
+        # PIL releases the GIL while encoding, so the cameras are encoded in parallel.
+        keys = list(obs_obj.images.keys())
+        images = self._get_encode_pool().map(encode, [obs_obj.images[k][0] for k in keys])
+        return {
+            "images": dict(zip(keys, images)),
+            "states": {k: v.tolist() for k, v in obs_obj.states.items()},
+            "text": obs_obj.text,
+        }
+
+    def _pack_message(self, obs: Observation) -> str | bytes:
+        message = {
+            "type": "observation_update",
+            "payload": self._serialize_observation(obs),
+        }
+        if self.protocol == "msgpack":
+            return msgpack.packb(message)
+        return json.dumps(message)
+
+    async def run(self):
+        """Connects to the viewer, reconnecting on failure, and sends queued observations until `stop()`."""
+        while not self._stop_event.is_set():
+            try:
+                async with websockets.connect(self.websocket_uri) as websocket:
+                    logger.success("Communicator connected to BrokerServer.")
+                    await self._handle_sending(websocket)
+            except Exception as e:
+                logger.warning(f"Communicator connection failed: {e}. Retrying in 3s...")
+                await asyncio.sleep(3)
 
     def _run_websocket_loop(self):
-        async def async_loop():
-            while not self._stop_event.is_set():
-                try:
-                    async with websockets.connect(self.websocket_uri) as websocket:
-                        logger.success("Communicator connected to BrokerServer.")
-                        await self._handle_sending(websocket)
-                except Exception as e:
-                    logger.warning(f"Communicator connection failed: {e}. Retrying in 3s...")
-                    await asyncio.sleep(3)
-        asyncio.run(async_loop())
+        asyncio.run(self.run())
         logger.info("Communicator thread has stopped.")
 
     async def _handle_sending(self, websocket):
@@ -82,12 +128,9 @@ class RemoteViewerCommunicator:
                 if self._stop_event.is_set(): break
                 
                 # Serialize the complete observation object
-                serialized_obs = self._serialize_observation(obs)
-                
-                await websocket.send(json.dumps({
-                    "type": "observation_update",
-                    "payload": serialized_obs
-                }))
+                message = await asyncio.to_thread(self._pack_message, obs)
+                await websocket.send(message)
+                self.frames_sent += 1
                 self.data_queue.task_done()
             except websockets.exceptions.ConnectionClosed:
                 logger.warning("Connection closed while sending.")
@@ -101,14 +144,18 @@ class RemoteViewerCommunicator:
             logger.success("Remote viewer communicator thread started.")
 
     def stop(self):
+        self._stop_event.set()
+        try:
+            # Wakes up `_handle_sending`, which may be blocked on the queue.
+            self.data_queue.put_nowait(None)
+        except queue.Full:
+            pass
         if self._thread and self._thread.is_alive():
-            self._stop_event.set()
-            try:
-                self.data_queue.put_nowait(None)
-            except queue.Full:
-                pass
             self._thread.join(timeout=2.0)
             logger.info("Remote viewer communicator thread stopped.")
+        if self._encode_pool is not None:
+            self._encode_pool.shutdown(wait=False)
+            self._encode_pool = None
 
     def send_data(self, obs: Observation):
         try:
@@ -116,30 +163,104 @@ class RemoteViewerCommunicator:
         except queue.Full:
             try:
                 self.data_queue.get_nowait()
+                self.frames_dropped += 1
             except queue.Empty:
                 pass
             self.data_queue.put_nowait(obs)
             logger.debug("Data queue was full, old data discarded and new one added.")
 
 
+def _fit_image(image: np.ndarray, max_side: int) -> np.ndarray:
+    """Resizes a `(b, h, w, c)` uint8 batch so that h and w are at most `max_side`, keeping the aspect ratio.
+
+    Bilinear with `reducing_gap`, which box-filters large reductions first, so thin features are averaged instead of
+    skipped. Images that already fit, or that PIL cannot represent, are returned as they are.
+    """
+    height, width = image.shape[1:3]
+    channels = image.shape[3] if image.ndim == 4 else 0
+    if max(height, width) <= max_side or image.dtype != np.uint8 or channels not in (1, 3, 4):
+        return image
+    scale = max_side / max(height, width)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    frames = [
+        np.asarray(Image.fromarray(frame[..., 0] if channels == 1 else frame).resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0))
+        for frame in image
+    ]
+    return np.stack(frames).reshape(len(frames), size[1], size[0], channels)
+
+
 class RemoteViewerWrapper(Wrapper):
-    def __init__(self, env: Env, websocket_uri: str):
+    """Mirrors observations to the remote viewer.
+
+    Observations are sampled at no more than `max_fps` and downscaled to `max_side` before they are queued, so the
+    step loop pays nothing for frames the viewer would not display and the queue only holds small copies. On sampled steps the wrapped env is asked to
+    render (see `request_render`), and a full-resolution capture in `info["capture"]` replaces the matching
+    images. `frames_sent` and `frames_dropped` count the frames that reached the viewer and the ones skipped by
+    sampling or replaced in the queue.
+    """
+    def __init__(
+        self,
+        env: Env,
+        websocket_uri: str,
+        protocol: Literal["json", "msgpack"] = "json",
+        max_fps: float | None = None,
+        max_side: int | None = None,
+        start_communicator: bool = True,
+    ):
         super().__init__(env)
-        self.communicator = RemoteViewerCommunicator(websocket_uri)
-        self.communicator.start()
+        self.max_fps = max_fps
+        self.max_side = max_side
+        self.frames_skipped = 0
+        self._last_queued_time = None
+        self.communicator = RemoteViewerCommunicator(websocket_uri, protocol=protocol, max_side=max_side)
+        # With `start_communicator=False` the caller runs `self.communicator.run()` on its own event loop.
+        if start_communicator:
+            self.communicator.start()
         logger.info(f"RemoteViewerWrapper initialized for env '{env.unwrapped.__class__.__name__}'.")
 
+    @property
+    def frames_sent(self) -> int:
+        return self.communicator.frames_sent
+
+    @property
+    def frames_dropped(self) -> int:
+        return self.frames_skipped + self.communicator.frames_dropped
+
+    def _due(self) -> bool:
+        return (
+            self.max_fps is None
+            or self._last_queued_time is None
+            or time.perf_counter() - self._last_queued_time >= 1.0 / self.max_fps
+        )
+
+    def _offer(self, obs: Observation, info: dict):
+        self._last_queued_time = time.perf_counter()
+        if reuses_obs_buffers(self.env):
+            # The viewer thread encodes the frame after the env has moved on.
+            obs = copy_observation(obs)
+        images = {**obs.images, **info.get("capture", {})}
+        if self.max_side is not None:
+            images = {k: _fit_image(v, self.max_side) for k, v in images.items()}
+        self.communicator.send_data(Observation(images=images, states=obs.states, text=obs.text))
+
     def step(self, action):
+        due = self._due()
+        if due:
+            request_render(self.env, capture=True)
         obs, reward, terminated, truncated, info = self.env.step(action)
-        self.communicator.send_data(obs)
+        if due and obs is not None:
+            self._offer(obs, info)
+        else:
+            self.frames_skipped += 1
         return obs, reward, terminated, truncated, info
 
     def reset(self, **kwargs):
+        request_render(self.env, capture=True)
         obs, info = self.env.reset(**kwargs)
-        self.communicator.send_data(obs)
+        self._offer(obs, info)
         return obs, info
 
     def close(self):
-        logger.info("Closing RemoteViewerWrapper.")
+        logger.info(f"Closing RemoteViewerWrapper: {self.frames_sent} frames sent, {self.frames_dropped} dropped.")
         self.communicator.stop()
         self.env.close()
\ No newline at end of file
@@ -0,0 +1,70 @@
+import numpy as np
+from vlarl_client import msgpack_numpy
+
+from vlarl_infra.envs.base_env import Observation
+from vlarl_infra.transport import codecs, wire
+
+
+def make_obs(rng: np.random.Generator) -> Observation:
+    # 平滑的渐变图加少量噪声, 让 jpeg 的误差有一个稳定的上界
+    y, x = np.mgrid[0:96, 0:128]
+    base = np.stack([x * 2, y * 2, (x + y)], axis=-1) % 256
+    noise = rng.integers(0, 4, (2, 96, 128, 3))
+    return Observation(
+        images={
+            "rgb": (base + noise).clip(0, 255).astype(np.uint8),
+            "gray": rng.integers(0, 256, (2, 84, 84, 1), dtype=np.uint8),
+        },
+        states={"qpos": rng.random((2, 7)), "step": np.arange(2, dtype=np.int64)[:, None]},
+        text="pick up the red block",
+    )
+
+
+def round_trip(config: codecs.CodecConfig, obs: Observation) -> dict:
+    # 与 worker -> server 的路径一致: 编码, 打包成字节, 服务端 unpackb 后解码
+    encoder = codecs.ObservationEncoder(config)
+    packed = wire.packb(encoder.encode(obs))
+    return codecs.ObservationDecoder().decode(msgpack_numpy.unpackb(packed))
+
+
+rng = np.random.default_rng(0)
+obs = make_obs(rng)
+
+# 无损策略: 解码结果必须逐字节一致
+for spec in ("none", "lz4", "zstd", "zstd:9", "png"):
+    decoded = round_trip(codecs.CodecConfig(default_image_codec=spec), obs)
+    for key, image in obs.images.items():
+        assert decoded["images"][key].dtype == image.dtype, (spec, key)
+        assert np.array_equal(decoded["images"][key], image), (spec, key)
+    for key, state in obs.states.items():
+        assert np.array_equal(decoded["states"][key], state), (spec, key)
+    assert decoded["text"] == obs.text
+    print(f"{spec}: lossless")
+
+# 有损策略: 形状和 dtype 不变, 像素误差有界
+for spec, max_mean_error in (("jpeg:95", 3.0), ("jpeg:75", 6.0), ("webp:90", 6.0)):
+    decoded = round_trip(codecs.CodecConfig(images={"rgb": spec}), obs)
+    image = decoded["images"]["rgb"]
+    assert image.shape == obs.images["rgb"].shape and image.dtype == np.uint8, spec
+    error = np.abs(image.astype(np.int16) - obs.images["rgb"]).mean()
+    assert error <= max_mean_error, (spec, error)
+    # 未配置的键走默认的 none
+    assert np.array_equal(decoded["images"]["gray"], obs.images["gray"]), spec
+    print(f"{spec}: mean abs error {error:.2f}")
+
+# 按键混用策略, 并把浮点状态降为 float32
+config = codecs.CodecConfig(images={"rgb": "jpeg:90", "gray": "png"}, default_image_codec="lz4", state_dtype="float32")
+decoded = round_trip(config, obs)
+assert np.array_equal(decoded["images"]["gray"], obs.images["gray"])
+assert decoded["states"]["qpos"].dtype == np.float32
+assert np.array_equal(decoded["states"]["qpos"], obs.states["qpos"].astype(np.float32))
+assert decoded["states"]["step"].dtype == np.int64
+print("mixed per-key policy: ok")
+
+try:
+    codecs.make_codec("gzip")
+except ValueError:
+    pass
+else:
+    raise AssertionError("unknown codec spec was accepted")
+print("all codec round trips passed")
@@ -0,0 +1,58 @@
+import numpy as np
+from vlarl_client import msgpack_numpy
+
+from vlarl_infra.envs.atari.config import AtariConfig
+from vlarl_infra.transport import codecs, wire
+from vlarl_infra.utils.registration import load_env
+
+NUM_STEPS = 300
+STACK_KEYS = ["0", "1", "2", "3"]
+# 轮流使用 1..5 步的 replan 间隔: 小于帧栈长度时发增量帧, 否则发关键帧
+REPLAN_STEPS = [1, 2, 3, 4, 5]
+
+env = load_env("Atari-v1")(AtariConfig(name="BreakoutNoFrameskip-v4"))
+num_actions = env.env.action_space.n
+rng = np.random.default_rng(0)
+
+encoder = codecs.ObservationEncoder(codecs.CodecConfig(frame_stream_keys=STACK_KEYS))
+decoder = codecs.ObservationDecoder()
+num_messages = num_keyframes = num_resets = 0
+
+
+def check(obs) -> None:
+    global num_messages, num_keyframes
+    # fused 预处理返回的帧栈是环形缓冲区的视图, 先拷贝一份作为期望值
+    expected = {key: image.copy() for key, image in obs.images.items()}
+    message = encoder.encode(obs)
+    num_keyframes += message["frame_stream"]["keyframe"]
+    num_messages += 1
+    decoded = decoder.decode(msgpack_numpy.unpackb(wire.packb(message)))
+    assert decoded["images"].keys() == expected.keys()
+    for key, image in expected.items():
+        assert decoded["images"][key].dtype == image.dtype, key
+        assert np.array_equal(decoded["images"][key], image), (num_messages, key)
+
+
+obs, _ = env.reset(seed=0)
+encoder.reset()
+check(obs)
+step, until_infer = 0, REPLAN_STEPS[0]
+while step < NUM_STEPS:
+    obs, reward, terminated, truncated, info = env.step(np.array([rng.integers(num_actions)]))
+    step += 1
+    if terminated or truncated:
+        obs, _ = env.reset()
+        encoder.reset()
+        num_resets += 1
+        until_infer = 0
+    else:
+        until_infer -= 1
+    if until_infer <= 0:
+        check(obs)
+        until_infer = REPLAN_STEPS[num_messages % len(REPLAN_STEPS)]
+
+env.close()
+ratio = encoder.stats["frame_stream"].ratio
+print(f"{NUM_STEPS} steps, {num_messages} messages, {num_keyframes} keyframes, {num_resets} resets, ratio {ratio:.2f}x")
+assert num_keyframes < num_messages, "no delta message was exercised"
+print("frame stream round trip is bit-exact")
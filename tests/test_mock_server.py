@@ -1,5 +1,6 @@
 import asyncio
 import traceback
+from typing import Any
 import numpy as np
 
 import websockets.asyncio.server as _server
@@ -8,12 +9,21 @@ from loguru import logger
 
 from vlarl_client import msgpack_numpy
 from vlarl_client.websocket_worker_agent import MessageType
+from vlarl_infra.transport import codecs
+from vlarl_infra.transport.feedback import FEEDBACK_BATCH
+from vlarl_infra.transport.shm import SharedMemoryReader
 
 class MockAgentServer:
-    def __init__(self, host: str = "0.0.0.0", port: int = 8000, action_dim: int = 7):
+    def __init__(self, host: str = "0.0.0.0", port: int = 8000, action_dim: int = 7, action_horizon: int | None = None, max_infer_obs: int = 256):
         self._host = host
         self._port = port
         self._action_dim = action_dim
+        self._action_horizon = action_horizon
+        # 为解析 obs_ref 最多保留的 INFER 观测数
+        self._max_infer_obs = max_infer_obs
+        # 收到的字节数与消息数, 供 benchmarks/ 统计 bytes/step
+        self.bytes_received = 0
+        self.messages_received = 0
         
     def serve_forever(self) -> None:
         asyncio.run(self.run())
@@ -28,6 +38,9 @@ class MockAgentServer:
     async def _handler(self, websocket: _server.ServerConnection):
         logger.info(f"Connection from {websocket.remote_address} opened")
         packer = msgpack_numpy.Packer()
+        # --transport shm 时观测以共享内存描述符的形式发送
+        shm_reader = SharedMemoryReader()
+        obs_decoder = codecs.ObservationDecoder()
         
         try:
             mock_weights = {"dummy_key": 1.0}
@@ -35,41 +48,72 @@ class MockAgentServer:
             await websocket.send(packer.pack(metadata_message))
             logger.info("Sent initial metadata to client.")
 
+            # 已收到的 INFER 观测, 按连接内的 0-based 序号保存, 用于解析 feedback_batch 中的 obs_ref
+            infer_obs: dict[int, Any] = {}
+            num_infers = 0
+            # obs_ref 指向尚未收到的 INFER 时, 记录先挂起, 收到该 INFER 后再补上观测
+            awaiting_obs: dict[int, list[dict]] = {}
+
             while True:
-                # 2. 等待 INFER 请求
-                # 这是每个 step 的开始
-                packed_infer_msg = await websocket.recv()
-                infer_msg = msgpack_numpy.unpackb(packed_infer_msg)
-                
-                if infer_msg.get("message_type") != str(MessageType.INFER):
-                    logger.warning(f"Expected an INFER message but received: {infer_msg.get('message_type')}")
-                    continue # 跳过，继续等待下一个INFER请求
+                # 2. 按消息类型处理: 批量反馈模式下 FEEDBACK 与 INFER 不再严格交替
+                packed_msg = await websocket.recv()
+                self.bytes_received += len(packed_msg)
+                self.messages_received += 1
+                msg = msgpack_numpy.unpackb(packed_msg)
+                message_type = msg.get("message_type")
+
+                if message_type == str(MessageType.INFER):
+                    obs = obs_decoder.decode(shm_reader.resolve(msg.get("data")))
+                    # logger.info(f"Received inference request for observation: {obs}")
+                    infer_obs[num_infers] = obs
+                    for record in awaiting_obs.pop(num_infers, []):
+                        record["obs"] = obs
+                    infer_obs.pop(num_infers - self._max_infer_obs, None)
+                    num_infers += 1
+
+                    # 3. 模拟推理并发送动作
+                    # batch 维度与观测保持一致 (--num-envs 时 b > 1)
+                    arrays = [*obs["images"].values(), *obs.get("states", {}).values()]
+                    batch_size = arrays[0].shape[0] if arrays else 1
+                    if self._action_horizon is None:
+                        action = np.random.rand(batch_size, self._action_dim).astype(np.float32)
+                    else:
+                        action = np.random.rand(batch_size, self._action_horizon, self._action_dim).astype(np.float32)
+                    action_response = dict(message_type=str(MessageType.ACTION), data={"action": action})
+                    await websocket.send(packer.pack(action_response))
+                    # logger.info(f"Sent back dummy action: {action}")
 
-                obs = infer_msg.get("data")
-                # logger.info(f"Received inference request for observation: {obs}")
+                elif message_type == str(MessageType.FEEDBACK):
+                    # 4. 处理单条 FEEDBACK 消息
+                    feedback_data = msg.get("data")
+                    # 反馈中的观测也属于同一个帧流, 需要按顺序解码
+                    if isinstance(feedback_data, dict) and "obs" in feedback_data:
+                        feedback_data["obs"] = obs_decoder.decode(shm_reader.resolve(feedback_data["obs"]))
 
-                # 3. 模拟推理并发送动作
-                action = np.random.rand(1, self._action_dim).astype(np.float32)
-                action_response = dict(message_type=str(MessageType.ACTION), data={"action": action})
-                await websocket.send(packer.pack(action_response))
-                # logger.info(f"Sent back dummy action: {action}")
-                
-                # 4. 立即等待并处理 FEEDBACK 消息
-                # 这是一个阻塞的操作，确保服务器在处理完一个step后才继续
-                packed_feedback_msg = await websocket.recv()
-                feedback_msg = msgpack_numpy.unpackb(packed_feedback_msg)
+                elif message_type == FEEDBACK_BATCH:
+                    # 批量反馈: 观测不走帧流; obs_ref 指向之后那次 INFER 的观测, 可能尚未收到
+                    for record in shm_reader.resolve(msg.get("data"))["records"]:
+                        if "obs" in record:
+                            record["obs"] = obs_decoder.decode(record["obs"])
+                        elif "obs_ref" in record:
+                            ref = record["obs_ref"]
+                            if ref >= num_infers:
+                                awaiting_obs.setdefault(ref, []).append(record)
+                            elif ref in infer_obs:
+                                record["obs"] = infer_obs[ref]
+                            else:
+                                logger.warning(f"Feedback refers to an unknown infer message {ref}")
 
-                if feedback_msg.get("message_type") == str(MessageType.FEEDBACK):
-                    feedback_data = feedback_msg.get("data")
                 else:
-                    logger.warning(f"Expected a FEEDBACK message but received: {feedback_msg.get('message_type')}")
+                    logger.warning(f"Unexpected message type: {message_type}")
                     # 如果接收到错误的类型，这里可以选择处理方式，比如关闭连接或忽略
-        
+
         except websockets.ConnectionClosed:
             logger.info(f"Connection from {websocket.remote_address} closed.")
+            shm_reader.close()
         except Exception:
             traceback_str = traceback.format_exc()
-            logger.error(f"Internal server error:\n{traceback_str} {packed_infer_msg}")
+            logger.error(f"Internal server error:\n{traceback_str}")
             await websocket.close(
                 code=websockets.frames.CloseCode.INTERNAL_ERROR,
                 reason="Internal server error."
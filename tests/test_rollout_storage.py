@@ -0,0 +1,73 @@
+import tempfile
+
+import numpy as np
+
+from vlarl_infra.envs.base_env import Observation
+from vlarl_infra.utils.rollout_storage import RolloutReader, RolloutWriter
+
+# 两个长度不同的回合; chunk_bytes 取得很小, 让每一列都被切成多个 shard
+EPISODE_LENGTHS = [37, 250]
+CHUNK_BYTES = 64 << 10
+
+rng = np.random.default_rng(0)
+# 环境会在下一步复用输出缓冲区, writer 必须在 append 时拷贝
+frame = np.empty((1, 32, 32, 3), dtype=np.uint8)
+
+
+def make_obs(text: str) -> Observation:
+    frame[:] = rng.integers(0, 256, frame.shape, dtype=np.uint8)
+    return Observation(images={"rgb": frame}, states={"qpos": rng.random((1, 7))}, text=text)
+
+
+expected = []
+with tempfile.TemporaryDirectory() as root:
+    writer = RolloutWriter(root, chunk_bytes=CHUNK_BYTES)
+    for i, num_steps in enumerate(EPISODE_LENGTHS):
+        obs = make_obs(f"task {i}")
+        episode = {"text": obs.text, "rgb": [frame.copy()], "qpos": [obs.states["qpos"]], "action": [], "reward": []}
+        writer.begin_episode(obs)
+        for t in range(num_steps):
+            action = rng.random((1, 7)).astype(np.float32)
+            reward = float(rng.random())
+            obs = make_obs(f"task {i}")
+            done = t == num_steps - 1
+            writer.append_step(action, obs, reward, terminated=done, truncated=False)
+            episode["rgb"].append(frame.copy())
+            episode["qpos"].append(obs.states["qpos"])
+            episode["action"].append(action)
+            episode["reward"].append(reward)
+        writer.end_episode({"episode": {"r": np.float32(sum(episode["reward"])), "l": num_steps}})
+        expected.append(episode)
+    writer.close()
+
+    reader = RolloutReader(root)
+    assert len(reader) == len(EPISODE_LENGTHS)
+    for i, episode in enumerate(expected):
+        record = reader.records[i]
+        assert record["num_steps"] == EPISODE_LENGTHS[i]
+        assert np.isclose(record["return"], sum(episode["reward"]))
+        assert record["info"]["l"] == EPISODE_LENGTHS[i]
+
+        ep = reader.episode(i)
+        assert ep.num_steps == EPISODE_LENGTHS[i] and ep.text == episode["text"]
+        assert len(ep.shards("obs.images.rgb")) > 1, "expected the image column to span several shards"
+        # 读取走 mmap, 不把整个文件载入内存
+        assert all(isinstance(shard, np.memmap) for shard in ep.shards("obs.images.rgb"))
+
+        assert np.array_equal(ep.column("obs.images.rgb"), np.stack(episode["rgb"]))
+        assert np.array_equal(ep.column("obs.states.qpos"), np.stack(episode["qpos"]))
+        assert np.array_equal(ep.column("action"), np.stack(episode["action"]))
+        assert np.array_equal(ep.column("reward"), np.asarray(episode["reward"], dtype=np.float32))
+        terminated = ep.column("terminated")
+        assert terminated[-1] and not terminated[:-1].any() and not ep.column("truncated").any()
+
+        # 跨 shard 的随机访问
+        for t in (0, ep.num_steps // 2, ep.num_steps):
+            obs = ep.observation(t)
+            assert np.array_equal(obs.images["rgb"], episode["rgb"][t])
+            assert np.array_equal(obs.states["qpos"], episode["qpos"][t])
+        start, stop = 3, ep.num_steps - 2
+        assert np.array_equal(ep.rows("obs.images.rgb", start, stop), np.stack(episode["rgb"][start:stop]))
+        print(f"episode {i}: {ep.num_steps} steps, {len(ep.shards('obs.images.rgb'))} image shards, round trip ok")
+
+print("rollout write -> mmap read round trip passed")